@@ -0,0 +1,153 @@
+"""
+Time-windowed micro-batching for AI calls.
+Requests arriving within a short window are collected and handed to a batch handler together;
+each caller awaits its own result (or exception).
+"""
+import asyncio
+import logging
+from collections.abc import Awaitable, Callable
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+# Collect requests for this long before dispatching a batch
+BATCH_WINDOW_SECONDS = 0.05
+
+# Max requests per batch
+MAX_BATCH = 8
+
+# Image batches: max image API calls in flight across batches
+MAX_IN_FLIGHT = 16
+
+# Image calls are dispatched individually anyway, so don't hold a lone request back; requests already
+# queued together still share a batch
+IMAGE_BATCH_WINDOW_SECONDS = 0.0
+
+# Batch handler: takes the submitted argument tuples, returns one result or exception per item (same order)
+BatchHandler = Callable[[list[tuple]], Awaitable[list[Any]]]
+
+
+class MicroBatcher:
+    """
+    Queue submit(*args) calls and dispatch them in batches via handle_batch(list_of_args).
+    Callers await submit() and get their own result (or exception) back.
+    The app lifespan starts and stops the shared instances; submit() also starts the worker lazily.
+    """
+
+    def __init__(
+        self,
+        handle_batch: BatchHandler | None = None,
+        *,
+        window: float = BATCH_WINDOW_SECONDS,
+        max_batch: int = MAX_BATCH,
+    ):
+        self._handle_batch = handle_batch
+        self._window = window
+        self._max_batch = max_batch
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+        self._dispatches: set[asyncio.Task] = set()
+
+    def start(self) -> None:
+        """Start the background worker on the running event loop (no-op if already running there)."""
+        loop = asyncio.get_running_loop()
+        if self._loop is loop and self._worker and not self._worker.done():
+            return
+        self._loop = loop
+        self._queue = asyncio.Queue()
+        self._dispatches = set()
+        self._on_start()
+        self._worker = loop.create_task(self._run())
+
+    def _on_start(self) -> None:
+        """Hook for subclasses to create loop-bound state."""
+
+    async def stop(self) -> None:
+        """Cancel the worker; in-flight batches are allowed to finish."""
+        if self._worker:
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+        if self._dispatches:
+            await asyncio.gather(*self._dispatches, return_exceptions=True)
+        self._worker = None
+        self._loop = None
+
+    async def submit(self, *args: Any) -> Any:
+        """Queue a request and wait for its result."""
+        self.start()
+        future = self._loop.create_future()
+        await self._queue.put((args, future))
+        return await future
+
+    async def handle_batch(self, batch: list[tuple]) -> list[Any]:
+        return await self._handle_batch(batch)
+
+    async def _run(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            deadline = self._loop.time() + self._window
+            while len(batch) < self._max_batch:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - self._loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+            task = self._loop.create_task(self._dispatch(batch))
+            self._dispatches.add(task)
+            task.add_done_callback(self._dispatches.discard)
+
+    async def _dispatch(self, batch: list[tuple[tuple, asyncio.Future]]) -> None:
+        logger.debug("%s dispatching batch of %d", type(self).__name__, len(batch))
+        try:
+            results = await self.handle_batch([args for args, _ in batch])
+        except Exception as e:
+            results = [e] * len(batch)
+        for (_, future), result in zip(batch, results):
+            if future.done():
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+
+class ImageBatcher(MicroBatcher):
+    """
+    Batch image prompts: submit(prompt, api_key). Each batch is dispatched as concurrent
+    generate(prompt, api_key) calls, with at most max_in_flight image calls at once.
+    """
+
+    def __init__(
+        self,
+        generate: Callable[[str, str], Awaitable[Any]],
+        *,
+        window: float = IMAGE_BATCH_WINDOW_SECONDS,
+        max_batch: int = MAX_BATCH,
+        max_in_flight: int = MAX_IN_FLIGHT,
+    ):
+        super().__init__(window=window, max_batch=max_batch)
+        self._generate = generate
+        self._max_in_flight = max_in_flight
+        self._limit: asyncio.Semaphore | None = None
+
+    def _on_start(self) -> None:
+        self._limit = asyncio.Semaphore(self._max_in_flight)
+
+    async def handle_batch(self, batch: list[tuple]) -> list[Any]:
+        return await asyncio.gather(
+            *(self._limited(prompt, api_key) for prompt, api_key in batch),
+            return_exceptions=True,
+        )
+
+    async def _limited(self, prompt: str, api_key: str) -> Any:
+        async with self._limit:
+            return await self._generate(prompt, api_key)
@@ -0,0 +1,33 @@
+"""Shared AsyncOpenAI clients, one per API key, so art and stat requests reuse the same connection pool."""
+from typing import TYPE_CHECKING
+
+import httpx
+
+if TYPE_CHECKING:
+    from openai import AsyncOpenAI
+
+# Connection pool per client: keep-alive connections are reused across requests (HTTP/2 multiplexes)
+HTTP_LIMITS = httpx.Limits(max_connections=64, max_keepalive_connections=32)
+
+# Fail fast on connect, allow 30s per read. The SDK retries connection errors, 408/409/429 and 5xx up to
+# MAX_RETRIES times with jittered exponential backoff; a failure that outlasts the retries is still raised
+# (as an openai.APIError subclass) to our callers
+HTTP_TIMEOUT = httpx.Timeout(30.0, connect=5.0)
+MAX_RETRIES = 3
+
+_ASYNC_CLIENTS: dict[str, "AsyncOpenAI"] = {}
+
+
+def get_async_client(api_key: str) -> "AsyncOpenAI":
+    """Return the process-wide AsyncOpenAI client for api_key (created on first use)."""
+    client = _ASYNC_CLIENTS.get(api_key)
+    if client is None:
+        from openai import AsyncOpenAI, DefaultAsyncHttpxClient
+
+        client = _ASYNC_CLIENTS[api_key] = AsyncOpenAI(
+            api_key=api_key,
+            timeout=HTTP_TIMEOUT,
+            max_retries=MAX_RETRIES,
+            http_client=DefaultAsyncHttpxClient(limits=HTTP_LIMITS, http2=True),
+        )
+    return client
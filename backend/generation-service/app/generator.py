@@ -1,11 +1,21 @@
 """Generate pixel art for card templates (placeholder or AI)."""
+import asyncio
 import base64
+import functools
+import hashlib
 import io
-import json
 import os
+import secrets
+import threading
+from collections import OrderedDict
 from pathlib import Path
 
-from PIL import Image
+import httpx
+import orjson
+from PIL import Image, ImageDraw, ImageFont
+
+from app.batcher import ImageBatcher
+from app.clients import get_async_client
 
 
 # Rarities that match the game contract (for border filenames)
@@ -14,9 +24,37 @@ RARITIES = ("Common", "Uncommon", "Rare", "Epic", "Legendary", "Mythic")
 # Output size for generated art (can be 32 or 1024; viewer may downscale)
 DEFAULT_ART_SIZE = 1024
 
+# Placeholders are drawn at most this large, then upscaled with nearest-neighbor
+PLACEHOLDER_RENDER_MAX = 256
+
+# Smaller placeholders are a solid color with no label
+PLACEHOLDER_LABEL_MIN_SIZE = 128
+
+# zlib level for PNG output: art is tiny or flat-colored, so level 1 compresses nearly as well as 6
+PNG_COMPRESS_LEVEL = 1
+
+# Font for placeholder labels (installed in the Docker image; falls back to PIL's default)
+PLACEHOLDER_FONT_PATH = "/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf"
+
 # AI-generated art: 32x32 pixel art sprite (top-down RPG item/unit icon style)
 PIXEL_ART_SIZE = 32
 
+# Intermediate size when downscaling AI renders to a sprite (see _downsample_to_sprite)
+SPRITE_INTERMEDIATE_SIZE = 128
+
+# Image model and requested size (part of the AI art cache key)
+IMAGE_MODEL = "gpt-image-1.5"
+IMAGE_API_SIZE = "1024x1024"
+
+# Image generation routinely outlasts the clients' 30s chat read timeout
+IMAGE_TIMEOUT = httpx.Timeout(120.0, connect=5.0)
+
+# AI art cache: PNG bytes keyed by prompt hash, kept in memory (LRU) and under art_dir/.cache
+AI_CACHE_DIRNAME = ".cache"
+AI_CACHE_MAX_ENTRIES = 512
+# On disk, the least recently used files beyond this many are deleted after each write
+AI_CACHE_MAX_FILES = 4096
+
 # Base style rules for pixel art (mandatory for all rarities)
 PIXEL_ART_STYLE_RULES = """
 Create a TRUE 32x32 pixel art sprite for a top-down medieval RPG item.
@@ -116,23 +154,53 @@ Design rules:
 """.strip(),
 }
 
+# Style rules + rarity rules per rarity; a prompt is this prefix plus the subject line
+_RARITY_PREFIX = {r: f"{PIXEL_ART_STYLE_RULES}\n\n{RARITY_DESIGN_RULES[r]}\n\n" for r in RARITIES}
 
-def load_catalog(catalog_path: str) -> list[dict]:
-    """Load card template catalog from JSON."""
+
+def read_json_file(path: Path):
+    """Parse a JSON file in one read."""
+    return orjson.loads(path.read_bytes())
+
+
+# Parsed catalogs keyed by path: (mtime_ns, templates, templateIds, templateId -> template)
+_CATALOG_CACHE: dict[str, tuple[int, list[dict], list[str], dict[str, dict]]] = {}
+
+
+def _load_catalog_cached(catalog_path: str) -> tuple[int, list[dict], list[str], dict[str, dict]]:
+    """Return the cached catalog entry, re-parsing only when the file's mtime changes."""
     path = Path(catalog_path)
-    if not path.exists():
-        return []
-    with open(path, encoding="utf-8") as f:
-        data = json.load(f)
-    return data if isinstance(data, list) else []
+    try:
+        mtime = path.stat().st_mtime_ns
+    except OSError:
+        _CATALOG_CACHE.pop(catalog_path, None)
+        return 0, [], [], {}
+    cached = _CATALOG_CACHE.get(catalog_path)
+    if cached and cached[0] == mtime:
+        return cached
+    data = read_json_file(path)
+    if not isinstance(data, list):
+        data = []
+    ids = [t["templateId"] for t in data if t.get("templateId")]
+    index = {t["templateId"]: t for t in data if t.get("templateId")}
+    entry = (mtime, data, ids, index)
+    _CATALOG_CACHE[catalog_path] = entry
+    return entry
+
+
+def load_catalog(catalog_path: str) -> list[dict]:
+    """Load card template catalog from JSON (cached until the file changes)."""
+    return _load_catalog_cached(catalog_path)[1]
+
+
+def list_template_ids(catalog_path: str) -> list[str]:
+    """Return the templateIds in the catalog, in catalog order."""
+    return _load_catalog_cached(catalog_path)[2]
 
 
 def get_template(catalog_path: str, template_id: str) -> dict | None:
     """Return the template with the given templateId, or None."""
-    for t in load_catalog(catalog_path):
-        if t.get("templateId") == template_id:
-            return t
-    return None
+    return _load_catalog_cached(catalog_path)[3].get(template_id)
 
 
 def build_image_prompt(
@@ -144,33 +212,200 @@ def build_image_prompt(
 ) -> str:
     """Build the prompt sent to the image model: style rules + rarity rules + subject."""
     rarity = (rarity or "Common").strip()
-    if rarity not in RARITIES:
+    if rarity not in _RARITY_PREFIX:
         rarity = "Common"
     subject = (prompt_description or display_name or "").strip() or "fantasy item or character"
     type_hint = f" ({template_type})" if template_type else ""
-    subject_line = f"SUBJECT TO DRAW: {subject}{type_hint}."
-    rarity_block = RARITY_DESIGN_RULES.get(rarity, RARITY_DESIGN_RULES["Common"])
-    return f"{PIXEL_ART_STYLE_RULES}\n\n{rarity_block}\n\n{subject_line}"
+    return f"{_RARITY_PREFIX[rarity]}SUBJECT TO DRAW: {subject}{type_hint}."
 
 
-def generate_image_ai(prompt: str, api_key: str) -> Image.Image:
-    """Generate a 32x32 pixel-art sprite via OpenAI (gpt-image-1.5). Returns a PIL Image (RGBA, 32x32)."""
-    from openai import OpenAI
+def _downsample_to_sprite(img: Image.Image) -> Image.Image:
+    """
+    Reduce a full-size render to a PIXEL_ART_SIZE sprite.
+    Area-average (BOX) to an intermediate size first so each sprite pixel comes from a
+    smoothed cell rather than one sampled point, then NEAREST for hard pixel edges.
+    """
+    if img.mode in ("1", "P"):
+        # PIL resizes palette images with NEAREST only; BOX needs real color channels
+        img = img.convert("RGBA")
+    if img.width > SPRITE_INTERMEDIATE_SIZE:
+        img = img.resize((SPRITE_INTERMEDIATE_SIZE, SPRITE_INTERMEDIATE_SIZE), Image.Resampling.BOX)
+    return img.resize((PIXEL_ART_SIZE, PIXEL_ART_SIZE), Image.Resampling.NEAREST)
+
 
-    client = OpenAI(api_key=api_key)
-    # 1024x1024 then downscale to 32x32 with nearest-neighbor for crisp pixel-art
+def _decode_sprite(b64: str) -> Image.Image:
+    """Decode a base64 PNG from the image API into a 32x32 RGBA sprite."""
+    raw = base64.b64decode(b64)
+    # BytesIO over bytes shares the buffer (no copy); downscale before converting so the
+    # RGBA conversion touches the sprite instead of a full 1024x1024 frame
+    with Image.open(io.BytesIO(raw), formats=["PNG"]) as src:
+        img = _downsample_to_sprite(src)
+    return img.convert("RGBA")
+
+
+async def generate_image_ai(prompt: str, api_key: str) -> Image.Image:
+    """Generate a 32x32 pixel-art sprite via OpenAI (gpt-image-1.5). Returns a PIL Image (RGBA, 32x32)."""
+    client = get_async_client(api_key)
+    # 1024x1024 (smallest size gpt-image models offer) then downscale to 32x32 for crisp pixel-art
     # GPT Image returns base64 by default; response_format is not supported for gpt-image-1.5
-    resp = client.images.generate(
-        model="gpt-image-1.5",
+    resp = await client.images.generate(
+        model=IMAGE_MODEL,
         prompt=prompt,
-        size="1024x1024",
+        size=IMAGE_API_SIZE,
         n=1,
+        timeout=IMAGE_TIMEOUT,
     )
-    b64 = resp.data[0].b64_json
-    raw = base64.b64decode(b64)
-    img = Image.open(io.BytesIO(raw)).convert("RGBA")
-    img = img.resize((PIXEL_ART_SIZE, PIXEL_ART_SIZE), Image.Resampling.NEAREST)
-    return img
+    return await asyncio.to_thread(_decode_sprite, resp.data[0].b64_json)
+
+
+# Shared batcher for image API calls
+IMAGE_BATCHER = ImageBatcher(generate_image_ai)
+
+# Output directories already created by this process (skips a mkdir syscall per request)
+_ENSURED_DIRS: set[Path] = set()
+
+
+def _ensure_dir(path: Path) -> None:
+    if path not in _ENSURED_DIRS:
+        path.mkdir(parents=True, exist_ok=True)
+        _ENSURED_DIRS.add(path)
+
+
+# Touched from asyncio.to_thread workers, so every access holds _AI_CACHE_LOCK
+_AI_MEMORY_CACHE: OrderedDict[str, bytes] = OrderedDict()
+_AI_CACHE_LOCK = threading.Lock()
+
+
+def _ai_cache_key(prompt: str) -> str:
+    """Cache key for an AI image: model, size and prompt fully determine the request."""
+    return hashlib.sha256(f"{IMAGE_MODEL}|{IMAGE_API_SIZE}|{prompt}".encode("utf-8")).hexdigest()
+
+
+def _remember_ai_bytes(key: str, data: bytes) -> None:
+    with _AI_CACHE_LOCK:
+        _AI_MEMORY_CACHE[key] = data
+        _AI_MEMORY_CACHE.move_to_end(key)
+        while len(_AI_MEMORY_CACHE) > AI_CACHE_MAX_ENTRIES:
+            _AI_MEMORY_CACHE.popitem(last=False)
+
+
+def _read_ai_cache(cache_dir: Path, key: str) -> bytes | None:
+    """Return cached PNG bytes for key from memory, falling back to disk; None on miss."""
+    with _AI_CACHE_LOCK:
+        data = _AI_MEMORY_CACHE.get(key)
+        if data is not None:
+            _AI_MEMORY_CACHE.move_to_end(key)
+            return data
+    path = cache_dir / f"{key}.png"
+    try:
+        data = path.read_bytes()
+        os.utime(path)  # mtime doubles as last use for _prune_ai_cache
+    except FileNotFoundError:
+        return None
+    _remember_ai_bytes(key, data)
+    return data
+
+
+def _write_ai_cache(cache_dir: Path, key: str, data: bytes) -> None:
+    _ensure_dir(cache_dir)
+    _write_file_atomic(cache_dir / f"{key}.png", data)
+    _remember_ai_bytes(key, data)
+    _prune_ai_cache(cache_dir)
+
+
+def _prune_ai_cache(cache_dir: Path, max_files: int = AI_CACHE_MAX_FILES) -> None:
+    """Delete the least recently used cache files beyond max_files (runs after an image API call, so a scan is cheap)."""
+    entries = []
+    with os.scandir(cache_dir) as it:
+        for entry in it:
+            if entry.name.endswith(".png"):
+                try:
+                    entries.append((entry.stat().st_mtime_ns, entry.path))
+                except FileNotFoundError:
+                    continue
+    if len(entries) <= max_files:
+        return
+    entries.sort()
+    for _, path in entries[: len(entries) - max_files]:
+        Path(path).unlink(missing_ok=True)
+
+
+def _encode_png(img: Image.Image) -> bytes:
+    """Encode img as PNG in memory."""
+    buf = io.BytesIO()
+    img.save(buf, "PNG", compress_level=PNG_COMPRESS_LEVEL)
+    return buf.getvalue()
+
+
+def _write_file_atomic(path: Path, data: bytes) -> None:
+    """Write data in one call to a temp file, then rename over path so readers never see a partial PNG."""
+    tmp = path.with_name(f"{path.name}.{secrets.token_hex(4)}.tmp")
+    try:
+        tmp.write_bytes(data)
+        tmp.replace(path)
+    except BaseException:
+        tmp.unlink(missing_ok=True)
+        raise
+
+
+@functools.lru_cache(maxsize=4096)
+def _unlabeled_placeholder_png(template_id: str, size: int) -> bytes:
+    return _encode_png(generate_placeholder(template_id, size))
+
+
+def _render_placeholder_png(template_id: str, size: int, label: str) -> bytes:
+    if size < PLACEHOLDER_LABEL_MIN_SIZE:
+        # No label is drawn at this size, so the PNG depends only on template_id and size
+        return _unlabeled_placeholder_png(template_id, size)
+    return _encode_png(generate_placeholder(template_id, size, display_name=label))
+
+
+# Loaded fonts keyed by (font path, pixel size); FreeType face setup is the costly part
+_FONT_CACHE: dict[tuple[str, int], ImageFont.FreeTypeFont | ImageFont.ImageFont] = {}
+
+
+def _get_font(size_px: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
+    """Return the placeholder label font at size_px, loading it once per process."""
+    key = (PLACEHOLDER_FONT_PATH, size_px)
+    font = _FONT_CACHE.get(key)
+    if font is None:
+        try:
+            font = ImageFont.truetype(PLACEHOLDER_FONT_PATH, size_px)
+        except OSError:
+            font = ImageFont.load_default()
+        _FONT_CACHE[key] = font
+    return font
+
+
+@functools.lru_cache(maxsize=1024)
+def _text_size(text: str, size_px: int) -> tuple[int, int]:
+    """Width and height of text rendered with the placeholder font at size_px."""
+    left, top, right, bottom = _get_font(size_px).getbbox(text)
+    return right - left, bottom - top
+
+
+def _stable_hash(s: str) -> int:
+    """32-bit hash that is the same across processes (built-in hash() is salted per run)."""
+    return int.from_bytes(hashlib.blake2s(s.encode("utf-8"), digest_size=4).digest(), "little")
+
+
+def _placeholder_color(hue: int) -> tuple[int, int, int, int]:
+    """RGBA for hue (degrees) at saturation 0.5, value 0.8 -- muted so it's not harsh.
+
+    Integer form of colorsys.hsv_to_rgb for fixed S/V: V*255 = 204, min channel = 102.
+    """
+    sector, rem = divmod(hue * 6, 360)
+    rise = 102 + 102 * rem // 360
+    fall = 204 - 102 * rem // 360
+    r, g, b = (
+        (204, rise, 102),
+        (fall, 204, 102),
+        (102, 204, rise),
+        (102, fall, 204),
+        (rise, 102, 204),
+        (204, 102, fall),
+    )[sector]
+    return r, g, b, 255
 
 
 def generate_placeholder(
@@ -179,32 +414,38 @@ def generate_placeholder(
     *,
     display_name: str | None = None,
 ) -> Image.Image:
-    """Create a simple placeholder image (no API)."""
+    """Create a simple placeholder image (no API). Two-color palette image: background + white label."""
     label = (display_name or template_id).strip() or template_id
     # Distinct hue per template for variety (hash template_id to get a stable color)
-    h = hash(template_id) % 360
-    # Use a muted saturation/value so it's not harsh
-    from colorsys import hsv_to_rgb
-    r, g, b = hsv_to_rgb(h / 360.0, 0.5, 0.8)
-    color = (int(r * 255), int(g * 255), int(b * 255), 255)
-    img = Image.new("RGBA", (size, size), color)
+    color = _placeholder_color(_stable_hash(template_id) % 360)
+    # Flat color + text upscales losslessly, so draw small and skip filling a full-size canvas
+    render_size = min(size, PLACEHOLDER_RENDER_MAX)
+    # Palette index 0 = background, 1 = white text; encodes far smaller/faster than RGBA
+    img = Image.new("P", (render_size, render_size), 0)
+    img.putpalette([*color[:3], 255, 255, 255])
     # Optional: draw a simple border or text (for 1024 we'd need a font; for 32 we could skip text)
-    if size >= 128:
-        from PIL import ImageDraw, ImageFont
+    if render_size >= PLACEHOLDER_LABEL_MIN_SIZE:
         draw = ImageDraw.Draw(img)
-        try:
-            font = ImageFont.truetype("/usr/share/fonts/truetype/dejavu/DejaVuSans-Bold.ttf", size // 8)
-        except OSError:
-            font = ImageFont.load_default()
+        draw.fontmode = "1"  # no anti-aliasing: the palette only has the two colors
+        font = _get_font(render_size // 8)
         text = (label or template_id)[:12]
-        bbox = draw.textbbox((0, 0), text, font=font)
-        tw, th = bbox[2] - bbox[0], bbox[3] - bbox[1]
-        xy = ((size - tw) // 2, (size - th) // 2)
-        draw.text(xy, text, fill=(255, 255, 255, 255), font=font)
+        tw, th = _text_size(text, render_size // 8)
+        xy = ((render_size - tw) // 2, (render_size - th) // 2)
+        draw.text(xy, text, fill=1, font=font)
+    if render_size != size:
+        img = img.resize((size, size), Image.Resampling.NEAREST)
     return img
 
 
-def generate_and_save(
+def warm_up(catalog_path: str, api_key: str | None = None) -> None:
+    """Pre-load the catalog, placeholder font and AI client so the first request hits warm caches."""
+    _load_catalog_cached(catalog_path)
+    _get_font(min(DEFAULT_ART_SIZE, PLACEHOLDER_RENDER_MAX) // 8)
+    if api_key:
+        get_async_client(api_key)
+
+
+async def generate_and_save(
     template_id: str,
     art_dir: Path,
     catalog_path: str,
@@ -215,14 +456,17 @@ def generate_and_save(
     display_name: str | None = None,
     prompt_description: str | None = None,
     rarity: str | None = None,
+    force: bool = False,
 ) -> Path:
     """
     Generate art for the given templateId and save to art_dir.
     If templateId is not in the catalog, display_name or prompt_description must be provided.
     rarity is used for AI prompts (default Common); can come from template or request.
+    force skips the AI image cache so a new image is requested (it still replaces the cached one).
     Returns the path to the saved file.
     """
-    template = get_template(catalog_path, template_id)
+    # get_template stats the catalog (and re-parses it when it changes): keep that off the event loop
+    template = await asyncio.to_thread(get_template, catalog_path, template_id)
     if not template:
         if not (display_name or prompt_description):
             raise ValueError(
@@ -231,7 +475,7 @@ def generate_and_save(
         display_name = (display_name or prompt_description or template_id).strip()
 
     art_dir = Path(art_dir)
-    art_dir.mkdir(parents=True, exist_ok=True)
+    _ensure_dir(art_dir)
     out_path = art_dir / f"{template_id}.png"
     label = display_name or (template.get("displayName") if template else None) or template_id
     effective_rarity = rarity or (template.get("rarity") if template else None) or "Common"
@@ -244,10 +488,18 @@ def generate_and_save(
             template_type=template.get("type") if template else None,
             rarity=effective_rarity,
         )
-        img = generate_image_ai(prompt, api_key)
-        img.save(out_path, "PNG")
+        # Identical prompts (shared descriptions, re-created templates) reuse the earlier image unless forced
+        cache_dir = art_dir / AI_CACHE_DIRNAME
+        key = _ai_cache_key(prompt)
+        data = None if force else await asyncio.to_thread(_read_ai_cache, cache_dir, key)
+        if data is None:
+            img = await IMAGE_BATCHER.submit(prompt, api_key)
+            data = await asyncio.to_thread(_encode_png, img)
+            await asyncio.to_thread(_write_ai_cache, cache_dir, key, data)
+        await asyncio.to_thread(_write_file_atomic, out_path, data)
         return out_path
 
-    img = generate_placeholder(template_id, size, display_name=label)
-    img.save(out_path, "PNG")
+    # Placeholder drawing and PNG encoding are CPU-bound; keep them off the event loop
+    data = await asyncio.to_thread(_render_placeholder_png, template_id, size, label)
+    await asyncio.to_thread(_write_file_atomic, out_path, data)
     return out_path
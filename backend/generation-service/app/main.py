@@ -2,21 +2,49 @@
 Generation service: generate and serve card art and borders; generate stats for units and items.
 Supports any unit/item type, type controls (archetypes, slots, rarities), and drop-type-based generation.
 """
-import json
+import asyncio
 import logging
 import os
 import random
+import re
+import stat
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from functools import lru_cache
 from pathlib import Path
 
 logger = logging.getLogger(__name__)
 
-from fastapi import FastAPI, HTTPException
+import msgspec
+from fastapi import FastAPI, HTTPException, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import ORJSONResponse
 from pydantic import BaseModel
 
-from app.generator import generate_and_save, load_catalog, get_template, RARITIES
-from app.stat_generator import generate_unit, generate_item, SLOTS, UNIT_ARCHETYPES
+from app.generator import (
+    IMAGE_BATCHER,
+    generate_and_save,
+    get_template,
+    list_template_ids,
+    read_json_file,
+    warm_up,
+    RARITIES,
+)
+from app.stat_generator import (
+    RARITIES_SET,
+    SLOTS_SET,
+    STAT_BATCHER,
+    TEMPLATE_ID_MAX_LEN,
+    UNIT_ARCHETYPES_SET,
+    generate_unit_async,
+    generate_item_async,
+    SLOTS,
+    UNIT_ARCHETYPES,
+)
 
 # Paths (override with env in Docker)
 ASSETS_DIR = Path(os.environ.get("ASSETS_DIR", "/app/assets"))
@@ -27,25 +55,84 @@ DROP_TYPES_PATH = os.environ.get("DROP_TYPES_PATH", "/app/data/drop-types.json")
 BORDERS_DIR = ASSETS_DIR / "borders"
 ART_DIR = ASSETS_DIR / "art"
 
+# templateIds become filenames under ART_DIR: whitelist them before touching disk. New IDs are also
+# length-capped; reads only check characters so art saved under older, longer IDs stays reachable
+_TEMPLATE_RE = re.compile(rf"[A-Za-z0-9_\-]{{1,{TEMPLATE_ID_MAX_LEN}}}")
+_ART_NAME_RE = re.compile(r"[A-Za-z0-9_\-]+")
 
-def load_drop_types() -> list[dict]:
-    """Load drop type definitions (id, label, type, rarities, archetypes, slots)."""
+# Art can be regenerated in place (force=true), so clients revalidate it via ETag every time;
+# borders only change on redeploy
+ART_CACHE_CONTROL = "public, no-cache"
+BORDER_CACHE_CONTROL = "public, max-age=86400"
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Environment-derived settings that are read once per process."""
+    openai_key: str | None
+    use_ai: bool
+
+
+@lru_cache
+def get_settings() -> Settings:
+    api_key = os.environ.get("OPENAI_API_KEY") or None
+    return Settings(openai_key=api_key, use_ai=bool(api_key))
+
+
+# Parsed drop types: (mtime_ns, drop types, id -> drop type); reloaded when the file changes
+_DROP_TYPES_CACHE: tuple[int, list[dict], dict[str, dict]] | None = None
+
+
+def _load_drop_types_cached() -> tuple[int, list[dict], dict[str, dict]]:
+    global _DROP_TYPES_CACHE
     path = Path(DROP_TYPES_PATH)
-    if not path.exists():
-        return []
-    with open(path, encoding="utf-8") as f:
-        data = json.load(f)
-    return data if isinstance(data, list) else []
+    try:
+        mtime = path.stat().st_mtime_ns
+    except OSError:
+        _DROP_TYPES_CACHE = None
+        return 0, [], {}
+    if _DROP_TYPES_CACHE and _DROP_TYPES_CACHE[0] == mtime:
+        return _DROP_TYPES_CACHE
+    data = read_json_file(path)
+    if not isinstance(data, list):
+        data = []
+    _DROP_TYPES_CACHE = (mtime, data, {dt["id"]: dt for dt in data if dt.get("id")})
+    return _DROP_TYPES_CACHE
 
 
-def get_drop_type(drop_type_id: str) -> dict | None:
-    for dt in load_drop_types():
-        if dt.get("id") == drop_type_id:
-            return dt
-    return None
+def load_drop_types() -> list[dict]:
+    """Load drop type definitions (id, label, type, rarities, archetypes, slots)."""
+    return _load_drop_types_cached()[1]
 
 
-app = FastAPI(title="Card Generation Service", version="1.0.0")
+def get_drop_type(drop_type_id: str) -> dict | None:
+    return _load_drop_types_cached()[2].get(drop_type_id)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Warm caches and start background workers on startup; stop them on shutdown."""
+    started = time.perf_counter()
+    warm_up(CATALOG_PATH, get_settings().openai_key)
+    load_drop_types()
+    _load_borders()
+    logger.info("Warm-up finished in %.1f ms", (time.perf_counter() - started) * 1000)
+    IMAGE_BATCHER.start()
+    STAT_BATCHER.start()
+    yield
+    await IMAGE_BATCHER.stop()
+    await STAT_BATCHER.stop()
+
+
+app = FastAPI(
+    title="Card Generation Service",
+    version="1.0.0",
+    lifespan=lifespan,
+    # All JSON responses are serialized with orjson (a hard dependency, see requirements.txt). The stat and drop
+    # handlers return an ORJSONResponse themselves: their results are plain JSON-type dicts, and a returned
+    # Response also skips FastAPI's jsonable_encoder pass
+    default_response_class=ORJSONResponse,
+)
 
 app.add_middleware(
     CORSMiddleware,
@@ -56,6 +143,92 @@ app.add_middleware(
 )
 
 
+def _etag_matches(request: Request, etag: str) -> bool:
+    """True if the request's If-None-Match covers etag (weak comparison, as for GET)."""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    return any(tag.strip().removeprefix("W/") == etag for tag in header.split(","))
+
+
+def _etag_for(st: os.stat_result) -> str:
+    return f'"{st.st_mtime_ns:x}-{st.st_size:x}"'
+
+
+def _check_template_id(template_id: str, pattern: re.Pattern = _TEMPLATE_RE) -> None:
+    if not pattern.fullmatch(template_id):
+        raise HTTPException(status_code=400, detail=f"Invalid templateId: {template_id!r}")
+
+
+def _png_response(etag: str, size: int, request: Request, cache_control: str, load: Callable[[], bytes]) -> Response:
+    """
+    Serve PNG bytes from load() with ETag/Cache-Control. A 304 (client's copy is current) or a HEAD
+    request never calls load(); HEAD reports the size as Content-Length.
+    """
+    headers = {"Cache-Control": cache_control, "ETag": etag}
+    if _etag_matches(request, etag):
+        return Response(status_code=304, headers=headers)
+    if request.method == "HEAD":
+        headers["Content-Length"] = str(size)
+        return Response(media_type="image/png", headers=headers)
+    return Response(content=load(), media_type="image/png", headers=headers)
+
+
+# Borders: rarity -> (PNG bytes, ETag), read once (they only change on redeploy).
+# Only successful reads are cached, so a border that is missing now is looked for again on the next request.
+_BORDER_CACHE: dict[str, tuple[bytes, str]] = {}
+
+
+def _load_border(rarity: str) -> tuple[bytes, str] | None:
+    """Read one rarity's border into the cache; None if the file is missing."""
+    # Filename convention: Common -> CommonBorder.png
+    path = BORDERS_DIR / f"{rarity}Border.png"
+    try:
+        st = path.stat()
+        border = _BORDER_CACHE[rarity] = (path.read_bytes(), _etag_for(st))
+    except OSError:
+        return None
+    return border
+
+
+def _load_borders() -> None:
+    """Read all rarity borders into memory at startup."""
+    for rarity in RARITIES:
+        _load_border(rarity)
+
+
+# Recently served art: templateId -> (PNG bytes, ETag), LRU bounded by total bytes.
+# Entries are checked against the file's current ETag, so regenerated art is never served stale.
+# serve_art runs in the threadpool, so the cache and its byte count are only touched under _ART_CACHE_LOCK.
+ART_CACHE_MAX_BYTES = 32 * 1024 * 1024
+_ART_CACHE: OrderedDict[str, tuple[bytes, str]] = OrderedDict()
+_ART_CACHE_LOCK = threading.Lock()
+_art_cache_bytes = 0
+
+
+def _art_bytes(template_id: str, path: Path, etag: str) -> bytes:
+    """Art bytes for the file version identified by etag, from the LRU or disk."""
+    global _art_cache_bytes
+    with _ART_CACHE_LOCK:
+        cached = _ART_CACHE.get(template_id)
+        if cached and cached[1] == etag:
+            _ART_CACHE.move_to_end(template_id)
+            return cached[0]
+    data = path.read_bytes()
+    with _ART_CACHE_LOCK:
+        old = _ART_CACHE.pop(template_id, None)
+        if old:
+            _art_cache_bytes -= len(old[0])
+        _ART_CACHE[template_id] = (data, etag)
+        _art_cache_bytes += len(data)
+        while _art_cache_bytes > ART_CACHE_MAX_BYTES and _ART_CACHE:
+            _, (evicted, _) = _ART_CACHE.popitem(last=False)
+            _art_cache_bytes -= len(evicted)
+    return data
+
+
 @app.get("/health")
 def health():
     """Health check for Docker / orchestration."""
@@ -63,25 +236,31 @@ def health():
 
 
 @app.get("/assets/art/{template_id}.png")
-def serve_art(template_id: str):
-    """Serve generated art for a template. Returns 404 if not yet generated."""
+@app.head("/assets/art/{template_id}.png")
+def serve_art(template_id: str, request: Request):
+    """Serve generated art for a template. Returns 404 if not yet generated. HEAD returns headers only."""
+    _check_template_id(template_id, _ART_NAME_RE)
     path = ART_DIR / f"{template_id}.png"
-    if not path.is_file():
+    try:
+        st = path.stat()
+    except OSError:
+        st = None
+    if st is None or not stat.S_ISREG(st.st_mode):
+        _KNOWN_ART.discard(template_id)
         raise HTTPException(status_code=404, detail=f"Art not found: {template_id}")
-    return FileResponse(path, media_type="image/png")
+    etag = _etag_for(st)
+    return _png_response(etag, st.st_size, request, ART_CACHE_CONTROL, lambda: _art_bytes(template_id, path, etag))
 
 
 @app.get("/assets/borders/{rarity}.png")
-def serve_border(rarity: str):
+def serve_border(rarity: str, request: Request):
     """Serve border image for a rarity (Common, Uncommon, Rare, Epic, Legendary, Mythic)."""
-    if rarity not in RARITIES:
-        raise HTTPException(status_code=404, detail=f"Unknown rarity: {rarity}")
-    # Filename convention: Common -> CommonBorder.png
-    filename = f"{rarity}Border.png"
-    path = BORDERS_DIR / filename
-    if not path.is_file():
-        raise HTTPException(status_code=404, detail=f"Border not found: {rarity}")
-    return FileResponse(path, media_type="image/png")
+    border = _BORDER_CACHE.get(rarity) or (_load_border(rarity) if rarity in RARITIES_SET else None)
+    if border is None:
+        detail = f"Border not found: {rarity}" if rarity in RARITIES_SET else f"Unknown rarity: {rarity}"
+        raise HTTPException(status_code=404, detail=detail)
+    data, etag = border
+    return _png_response(etag, len(data), request, BORDER_CACHE_CONTROL, lambda: data)
 
 
 # --- Drop-type-based generation (register before /generate/{template_id} so /generate/drop is matched) ---
@@ -100,32 +279,32 @@ def list_drop_types():
 
 
 @app.post("/generate/drop")
-def generate_from_drop(body: GenerateDropRequest):
+async def generate_from_drop(body: GenerateDropRequest):
     """
     Generate a unit or item according to a drop type (e.g. rare_unit_drop, legendary_item_drop).
     Uses drop type's rarities, archetypes (units), and slots (items). Optional rarityOverride to force a rarity.
     Returns the same shape as /generate/unit or /generate/item, plus dropTypeId and kind (unit|item).
     """
-    drop = get_drop_type(body.dropTypeId)
+    drop = await asyncio.to_thread(get_drop_type, body.dropTypeId)
     if not drop:
         raise HTTPException(status_code=404, detail=f"Unknown dropTypeId: {body.dropTypeId}")
     rarities = drop.get("rarities") or []
     if not rarities:
         raise HTTPException(status_code=400, detail=f"Drop type {body.dropTypeId} has no rarities")
-    rarity = body.rarityOverride if body.rarityOverride in RARITIES else random.choice(rarities)
-    if rarity not in RARITIES:
-        rarity = random.choice(list(RARITIES))
+    rarity = body.rarityOverride if body.rarityOverride in RARITIES_SET else random.choice(rarities)
+    if rarity not in RARITIES_SET:
+        rarity = random.choice(RARITIES)
 
     kind = drop.get("type") or "any"
     if kind == "any":
         kind = random.choice(("unit", "item"))
 
-    api_key = os.environ.get("OPENAI_API_KEY")
+    api_key = get_settings().openai_key
     try:
         if kind == "unit":
             archetypes = drop.get("archetypes")
             archetype = random.choice(archetypes) if archetypes else None
-            result = generate_unit(
+            result = await generate_unit_async(
                 rarity,
                 RULES_PATH,
                 display_name=None,
@@ -136,8 +315,8 @@ def generate_from_drop(body: GenerateDropRequest):
             result["kind"] = "unit"
         else:
             slots = drop.get("slots")
-            slot = random.choice(slots) if slots else random.choice(list(SLOTS))
-            result = generate_item(rarity, slot, RULES_PATH, api_key=api_key)
+            slot = random.choice(slots) if slots else random.choice(SLOTS)
+            result = await generate_item_async(rarity, slot, RULES_PATH, api_key=api_key)
             result["kind"] = "item"
     except (ValueError, FileNotFoundError) as e:
         raise HTTPException(status_code=400, detail=str(e))
@@ -146,70 +325,13 @@ def generate_from_drop(body: GenerateDropRequest):
         raise HTTPException(status_code=502, detail=str(e))
 
     result["dropTypeId"] = body.dropTypeId
-    return result
-
-
-# --- Art generation (template_id must not be "drop"; use /generate/drop for drop types) ---
+    return ORJSONResponse(result)
 
 
-class GenerateArtRequest(BaseModel):
-    """Optional body for POST /generate/{template_id} when template is not in catalog."""
-    displayName: str | None = None
-    promptDescription: str | None = None
-    rarity: str | None = None  # Common, Uncommon, Rare, Epic, Legendary, Mythic — used for AI prompt
+# --- Stat generation (units and items; register before /generate/{template_id} so /generate/unit and /generate/item are matched) ---
 
 
-@app.post("/generate/{template_id}")
-def generate(template_id: str, force: bool = False, body: GenerateArtRequest | None = None):
-    """
-    Generate pixel art for the given templateId.
-    Saves to assets/art/{template_id}.png.
-    For AI-generated templates not in the catalog, pass body with displayName and/or promptDescription.
-    Use force=true to regenerate if file already exists.
-    """
-    if template_id == "drop":
-        raise HTTPException(
-            status_code=400,
-            detail="Use POST /generate/drop with body { dropTypeId } to open a drop, not this endpoint.",
-        )
-    path = ART_DIR / f"{template_id}.png"
-    if path.is_file() and not force:
-        return {
-            "templateId": template_id,
-            "url": f"/assets/art/{template_id}.png",
-            "cached": True,
-        }
-    try:
-        generate_and_save(
-            template_id=template_id,
-            art_dir=ART_DIR,
-            catalog_path=CATALOG_PATH,
-            use_ai=bool(os.environ.get("OPENAI_API_KEY")),
-            api_key=os.environ.get("OPENAI_API_KEY"),
-            display_name=body.displayName if body else None,
-            prompt_description=body.promptDescription if body else None,
-            rarity=body.rarity if body else None,
-        )
-    except ValueError as e:
-        raise HTTPException(status_code=400, detail=str(e))
-    return {
-        "templateId": template_id,
-        "url": f"/assets/art/{template_id}.png",
-        "cached": False,
-    }
-
-
-@app.get("/templates")
-def list_templates():
-    """List all template IDs from the catalog (for UI or Nakama)."""
-    catalog = load_catalog(CATALOG_PATH)
-    return {"templates": [t.get("templateId") for t in catalog if t.get("templateId")]}
-
-
-# --- Stat generation (units and items); prompts adhere to stat_generation_rules.txt ---
-
-
-class GenerateUnitRequest(BaseModel):
+class GenerateUnitRequest(msgspec.Struct):
     """Request body for POST /generate/unit. Any unit type; optional type controls."""
     rarity: str
     templateId: str | None = None
@@ -218,7 +340,7 @@ class GenerateUnitRequest(BaseModel):
     allowedArchetypes: list[str] | None = None
 
 
-class GenerateItemRequest(BaseModel):
+class GenerateItemRequest(msgspec.Struct):
     """Request body for POST /generate/item. Any item type; slot or allowedSlots required."""
     rarity: str
     slot: str | None = None
@@ -227,76 +349,184 @@ class GenerateItemRequest(BaseModel):
     allowedSlots: list[str] | None = None
 
 
-@app.post("/generate/unit")
-def generate_unit_stats(body: GenerateUnitRequest):
+_UNIT_DECODER = msgspec.json.Decoder(GenerateUnitRequest)
+_ITEM_DECODER = msgspec.json.Decoder(GenerateItemRequest)
+
+
+# msgspec error suffixes: " - at `$.allowedSlots[0]`" and "Object missing required field `rarity`"
+_MSGSPEC_AT_RE = re.compile(r" - at `\$(.*)`$")
+_MSGSPEC_PATH_RE = re.compile(r"\.([^.\[]+)|\[(\d+)\]")
+_MSGSPEC_MISSING_RE = re.compile(r"missing required field `([^`]+)`")
+
+
+def _validation_detail(e: msgspec.DecodeError) -> list[dict]:
+    """FastAPI-shaped 422 detail ([{type, loc, msg}]) for a msgspec decode/validation error."""
+    msg = str(e)
+    if not isinstance(e, msgspec.ValidationError):
+        return [{"type": "json_invalid", "loc": ["body"], "msg": msg}]
+    loc: list[str | int] = ["body"]
+    at = _MSGSPEC_AT_RE.search(msg)
+    if at:
+        msg = msg[: at.start()]
+        loc += [key if key else int(index) for key, index in _MSGSPEC_PATH_RE.findall(at.group(1))]
+    missing = _MSGSPEC_MISSING_RE.search(msg)
+    if missing:
+        return [{"type": "missing", "loc": [*loc, missing.group(1)], "msg": "Field required"}]
+    return [{"type": "value_error", "loc": loc, "msg": msg}]
+
+
+def _decode_body(decoder: msgspec.json.Decoder, raw: bytes):
+    """Decode a JSON request body; malformed or mistyped bodies are a 422 shaped like FastAPI's own validation."""
+    try:
+        return decoder.decode(raw)
+    except msgspec.DecodeError as e:  # ValidationError is a subclass
+        raise HTTPException(status_code=422, detail=_validation_detail(e))
+
+
+def _openapi_body(struct: type[msgspec.Struct]) -> dict:
+    """openapi_extra documenting a msgspec request body (endpoints read the raw Request)."""
+    schema = msgspec.json.schema_components([struct])[1][struct.__name__]
+    return {"requestBody": {"required": True, "content": {"application/json": {"schema": schema}}}}
+
+
+@app.post("/generate/unit", openapi_extra=_openapi_body(GenerateUnitRequest))
+async def generate_unit_stats(request: Request):
     """
     Generate unit stats (any unit type). Optional type control: allowedArchetypes restricts to those archetypes.
     Returns name, rarity, archetype, stats, total_budget, suggestedTemplateId (for art and Nakama).
     """
-    if body.rarity not in RARITIES:
+    body = _decode_body(_UNIT_DECODER, await request.body())
+    if body.rarity not in RARITIES_SET:
         raise HTTPException(status_code=400, detail=f"Invalid rarity: {body.rarity}. Must be one of: {list(RARITIES)}")
     if body.allowedArchetypes is not None:
-        invalid = [a for a in body.allowedArchetypes if a not in UNIT_ARCHETYPES]
+        invalid = [a for a in body.allowedArchetypes if a not in UNIT_ARCHETYPES_SET]
         if invalid:
             raise HTTPException(status_code=400, detail=f"Invalid archetypes: {invalid}. Allowed: {list(UNIT_ARCHETYPES)}")
     display_name = body.displayName
     if body.templateId and not display_name:
-        template = get_template(CATALOG_PATH, body.templateId)
+        template = await asyncio.to_thread(get_template, CATALOG_PATH, body.templateId)
         if template:
             display_name = template.get("displayName")
     try:
-        result = generate_unit(
+        result = await generate_unit_async(
             body.rarity,
             RULES_PATH,
             template_id=body.templateId,
             display_name=display_name,
             archetype=body.archetype,
             allowed_archetypes=body.allowedArchetypes,
-            api_key=os.environ.get("OPENAI_API_KEY"),
+            api_key=get_settings().openai_key,
         )
     except (ValueError, FileNotFoundError) as e:
         raise HTTPException(status_code=400, detail=str(e))
     except RuntimeError as e:
         logger.error("Generate unit failed: %s", e)
         raise HTTPException(status_code=502, detail=str(e))
-    return result
+    return ORJSONResponse(result)
 
 
-@app.post("/generate/item")
-def generate_item_stats(body: GenerateItemRequest):
+@app.post("/generate/item", openapi_extra=_openapi_body(GenerateItemRequest))
+async def generate_item_stats(request: Request):
     """
     Generate item stats (any item type). Provide slot, or allowedSlots to pick one at random.
     Returns name, rarity, slot, bonuses, modifier, total_budget_used, suggestedTemplateId.
     """
-    if body.rarity not in RARITIES:
+    body = _decode_body(_ITEM_DECODER, await request.body())
+    if body.rarity not in RARITIES_SET:
         raise HTTPException(status_code=400, detail=f"Invalid rarity: {body.rarity}. Must be one of: {list(RARITIES)}")
     slot = body.slot
     if slot is None:
         if not body.allowedSlots:
             raise HTTPException(status_code=400, detail="Provide slot or allowedSlots")
-        valid = [s for s in body.allowedSlots if s in SLOTS]
+        valid = [s for s in body.allowedSlots if s in SLOTS_SET]
         if not valid:
             raise HTTPException(status_code=400, detail=f"allowedSlots must contain at least one of: {list(SLOTS)}")
         slot = random.choice(valid)
-    elif slot not in SLOTS:
+    elif slot not in SLOTS_SET:
         raise HTTPException(status_code=400, detail=f"Invalid slot: {slot}. Must be one of: {list(SLOTS)}")
     display_name = body.displayName
     if body.templateId and not display_name:
-        template = get_template(CATALOG_PATH, body.templateId)
+        template = await asyncio.to_thread(get_template, CATALOG_PATH, body.templateId)
         if template:
             display_name = template.get("displayName")
     try:
-        result = generate_item(
+        result = await generate_item_async(
             body.rarity,
             slot,
             RULES_PATH,
             template_id=body.templateId,
             display_name=display_name,
-            api_key=os.environ.get("OPENAI_API_KEY"),
+            api_key=get_settings().openai_key,
         )
     except (ValueError, FileNotFoundError) as e:
         raise HTTPException(status_code=400, detail=str(e))
     except RuntimeError as e:
         logger.error("Generate item failed: %s", e)
         raise HTTPException(status_code=502, detail=str(e))
-    return result
+    return ORJSONResponse(result)
+
+
+# --- Art generation (template_id must not be "drop"; use /generate/drop for drop types) ---
+
+# templateIds whose art is known to exist on disk (skips a stat per repeat /generate call).
+# Art is only ever replaced, never deleted, by this service; serve_art drops stale entries on 404.
+_KNOWN_ART: set[str] = set()
+
+
+class GenerateArtRequest(BaseModel):
+    """Optional body for POST /generate/{template_id} when template is not in catalog."""
+    displayName: str | None = None
+    promptDescription: str | None = None
+    rarity: str | None = None  # Common, Uncommon, Rare, Epic, Legendary, Mythic — used for AI prompt
+
+
+@app.post("/generate/{template_id}")
+async def generate(template_id: str, force: bool = False, body: GenerateArtRequest | None = None):
+    """
+    Generate pixel art for the given templateId.
+    Saves to assets/art/{template_id}.png.
+    For AI-generated templates not in the catalog, pass body with displayName and/or promptDescription.
+    Use force=true to regenerate if file already exists.
+    """
+    if template_id == "drop":
+        raise HTTPException(
+            status_code=400,
+            detail="Use POST /generate/drop with body { dropTypeId } to open a drop, not this endpoint.",
+        )
+    _check_template_id(template_id)
+    if not force and (
+        template_id in _KNOWN_ART or await asyncio.to_thread((ART_DIR / f"{template_id}.png").is_file)
+    ):
+        _KNOWN_ART.add(template_id)
+        return {
+            "templateId": template_id,
+            "url": f"/assets/art/{template_id}.png",
+            "cached": True,
+        }
+    settings = get_settings()
+    try:
+        await generate_and_save(
+            template_id=template_id,
+            art_dir=ART_DIR,
+            catalog_path=CATALOG_PATH,
+            use_ai=settings.use_ai,
+            api_key=settings.openai_key,
+            display_name=body.displayName if body else None,
+            prompt_description=body.promptDescription if body else None,
+            rarity=body.rarity if body else None,
+            force=force,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    _KNOWN_ART.add(template_id)
+    return {
+        "templateId": template_id,
+        "url": f"/assets/art/{template_id}.png",
+        "cached": False,
+    }
+
+
+@app.get("/templates")
+def list_templates():
+    """List all template IDs from the catalog (for UI or Nakama)."""
+    return {"templates": list_template_ids(CATALOG_PATH)}
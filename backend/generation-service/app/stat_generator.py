@@ -2,14 +2,24 @@
 Stat generation for units and items. Prompts adhere strictly to stat_generation_rules.txt.
 Supports any unit/item type (no catalog required); type controls via allowedArchetypes / allowedSlots.
 """
-import json
+import asyncio
+import functools
+import logging
 import os
 import re
 import secrets
 import sys
+import time
 from datetime import datetime, timezone
 from pathlib import Path
 
+import orjson
+
+from app.batcher import MicroBatcher
+from app.clients import get_async_client
+
+logger = logging.getLogger(__name__)
+
 
 def _debug_write_ai_response(kind: str, context: str, raw_text: str) -> None:
     """Append raw AI response to a text file for debugging. Remove this later."""
@@ -33,6 +43,12 @@ STAT_KEYS = ("hp_max", "stamina_max", "mana_max", "melee", "ranged", "magic", "m
 # From rules: unit archetypes (for type controls)
 UNIT_ARCHETYPES = ("Melee Specialist", "Ranger", "Mage", "Monster Brute", "Hybrid")
 
+# O(1) membership checks; the tuples above stay the ordered source of truth
+RARITIES_SET = frozenset(RARITIES)
+SLOTS_SET = frozenset(SLOTS)
+STAT_KEYS_SET = frozenset(STAT_KEYS)
+UNIT_ARCHETYPES_SET = frozenset(UNIT_ARCHETYPES)
+
 # From rules: unit rarity budget range (min, max inclusive)
 UNIT_BUDGET_RANGES = {
     "Common": (12, 14),
@@ -84,20 +100,65 @@ MYTHIC_MODIFIERS = (
     "MOD_CHEAT_DEATH_ONCE",
     "MOD_GAIN_STAT_ON_ACTION",
 )
+APPROVED_MODIFIERS = frozenset(LEGENDARY_MODIFIERS + MYTHIC_MODIFIERS)
+
+# Rarities whose items never carry a modifier
+NO_MODIFIER_RARITIES = frozenset(("Common", "Uncommon", "Rare", "Epic"))
+
+
+_SLUG_RE = re.compile(r"[^a-z0-9]+")
+
+# templateIds are used as art filenames; main.py rejects anything longer
+TEMPLATE_ID_MAX_LEN = 64
+# Room left for the slug after the "_" + 6 hex chars suffix
+_SLUG_MAX_LEN = TEMPLATE_ID_MAX_LEN - 7
 
 
 def suggest_template_id(name: str) -> str:
     """Produce a stable templateId from a name (for AI-generated units/items not in catalog)."""
-    slug = re.sub(r"[^a-z0-9]+", "_", (name or "gen").lower()).strip("_") or "gen"
+    slug = _SLUG_RE.sub("_", (name or "gen").lower()).strip("_")[:_SLUG_MAX_LEN].rstrip("_") or "gen"
     return f"{slug}_{secrets.token_hex(3)}"
 
 
+# Rules text per path: (last mtime check, mtime_ns, text). The file is re-stat'ed at most
+# every RULES_RECHECK_SECONDS and re-read only when its mtime changes.
+RULES_RECHECK_SECONDS = 5.0
+_RULES_CACHE: dict[str, tuple[float, int, str]] = {}
+
+
+def _fresh_rules(rules_path: str) -> str | None:
+    """Cached rules text if it was checked within RULES_RECHECK_SECONDS (no I/O), else None."""
+    cached = _RULES_CACHE.get(rules_path)
+    if cached and time.monotonic() - cached[0] < RULES_RECHECK_SECONDS:
+        return cached[2]
+    return None
+
+
 def load_rules(rules_path: str) -> str:
-    """Load the full stat generation rules text."""
+    """Load the full stat generation rules text (cached; reloaded when the file changes)."""
+    text = _fresh_rules(rules_path)
+    if text is not None:
+        return text
     path = Path(rules_path)
-    if not path.exists():
-        raise FileNotFoundError(f"Rules file not found: {rules_path}")
-    return path.read_text(encoding="utf-8").strip()
+    try:
+        mtime = path.stat().st_mtime_ns
+    except FileNotFoundError:
+        _RULES_CACHE.pop(rules_path, None)
+        raise FileNotFoundError(f"Rules file not found: {rules_path}") from None
+    cached = _RULES_CACHE.get(rules_path)
+    text = cached[2] if cached and cached[1] == mtime else path.read_text(encoding="utf-8").strip()
+    _RULES_CACHE[rules_path] = (time.monotonic(), mtime, text)
+    return text
+
+
+def _format_instruction(kind: str, standalone: bool, extra: str = "") -> str:
+    """Closing output-format instruction; batched tasks only name the format (the batch prompt asks for the array)."""
+    if standalone:
+        return (
+            f"Respond with ONLY a single JSON object matching the {kind} output format in section 10 (Output Format). "
+            f"{extra}No markdown code fences, no explanation, no other text."
+        )
+    return f"The object for this task must match the {kind} output format in section 10 (Output Format). {extra}".rstrip()
 
 
 def build_unit_prompt(
@@ -107,9 +168,13 @@ def build_unit_prompt(
     display_name: str | None = None,
     archetype: str | None = None,
     allowed_archetypes: list[str] | None = None,
+    standalone: bool = True,
 ) -> str:
-    """Build the user prompt for unit generation. Rules text is the system prompt."""
-    if rarity not in RARITIES:
+    """
+    Build the user prompt for unit generation. Rules text is the system prompt.
+    standalone=False leaves out the single-object response instruction, for use as one task of a batched prompt.
+    """
+    if rarity not in RARITIES_SET:
         raise ValueError(f"Invalid rarity: {rarity}")
     lo, hi = UNIT_BUDGET_RANGES[rarity]
     # TEMPORARY: per-stat caps disabled; only budget + structure enforced
@@ -126,17 +191,14 @@ def build_unit_prompt(
     if archetype:
         parts.append(f"Archetype (MUST use this one): {archetype}.")
     elif allowed_archetypes:
-        valid = [a for a in allowed_archetypes if a in UNIT_ARCHETYPES]
+        valid = [a for a in allowed_archetypes if a in UNIT_ARCHETYPES_SET]
         if valid:
             parts.append(f"Archetype MUST be exactly one of: {', '.join(valid)}.")
         else:
             parts.append("Choose exactly ONE archetype from: Melee Specialist, Ranger, Mage, Monster Brute, Hybrid.")
     else:
         parts.append("Choose exactly ONE archetype from: Melee Specialist, Ranger, Mage, Monster Brute, Hybrid.")
-    parts.append(
-        "Respond with ONLY a single JSON object matching the Unit output format in section 10 (Output Format). "
-        "No markdown code fences, no explanation, no other text."
-    )
+    parts.append(_format_instruction("Unit", standalone))
     return " ".join(parts)
 
 
@@ -146,11 +208,15 @@ def build_item_prompt(
     *,
     template_id: str | None = None,
     display_name: str | None = None,
+    standalone: bool = True,
 ) -> str:
-    """Build the user prompt for item generation. Rules text is the system prompt."""
-    if rarity not in RARITIES:
+    """
+    Build the user prompt for item generation. Rules text is the system prompt.
+    standalone=False leaves out the single-object response instruction, for use as one task of a batched prompt.
+    """
+    if rarity not in RARITIES_SET:
         raise ValueError(f"Invalid rarity: {rarity}")
-    if slot not in SLOTS:
+    if slot not in SLOTS_SET:
         raise ValueError(f"Invalid slot: {slot}")
     lo, hi = ITEM_BUDGET_RANGES[rarity]
     parts = [
@@ -162,24 +228,18 @@ def build_item_prompt(
     ]
     if template_id or display_name:
         parts.append(f"Use for name/flavor: templateId={template_id or 'any'}, displayName={display_name or 'any'}.")
-    parts.append(
-        "Respond with ONLY a single JSON object matching the Item output format in section 10 (Output Format). "
-        "Use modifier: null if rarity is Common, Uncommon, Rare, or Epic. "
-        "No markdown code fences, no explanation, no other text."
-    )
+    parts.append(_format_instruction("Item", standalone, "Use modifier: null if rarity is Common, Uncommon, Rare, or Epic. "))
     return " ".join(parts)
 
 
+def _budget_from_values(values) -> float:
+    """Rules budget formula over stat values in STAT_KEYS order (hp_max first, counted as hp_max / 3)."""
+    return sum(values[1:]) + values[0] / 3.0
+
+
 def _compute_unit_budget(stats: dict) -> float:
     """Compute total budget from stats (rules formula)."""
-    melee = stats.get("melee", 0)
-    ranged = stats.get("ranged", 0)
-    magic = stats.get("magic", 0)
-    maneuver = stats.get("maneuver", 0)
-    stamina = stats.get("stamina_max", 0)
-    mana = stats.get("mana_max", 0)
-    hp = stats.get("hp_max", 0)
-    return (melee + ranged + magic + maneuver) + stamina + mana + (hp / 3.0)
+    return _budget_from_values([stats.get(k, 0) for k in STAT_KEYS])
 
 
 def _compute_item_budget(bonuses: dict) -> float:
@@ -201,16 +261,23 @@ def validate_unit_payload(rarity: str, data: dict) -> None:
     for key in STAT_KEYS:
         if key not in stats:
             raise ValueError(f"Unit stats missing required key: {key}")
-    for k, v in stats.items():
-        if k not in STAT_KEYS:
-            raise ValueError(f"Unknown stat key: {k}")
+    if len(stats) != len(STAT_KEYS):
+        unknown = next(k for k in stats if k not in STAT_KEYS_SET)
+        raise ValueError(f"Unknown stat key: {unknown}")
+    _check_unit_values(rarity, [stats[k] for k in STAT_KEYS])
+
+
+def _check_unit_values(rarity: str, values: list) -> float:
+    """Value and budget checks for stat values in STAT_KEYS order; returns the budget."""
+    for k, v in zip(STAT_KEYS, values):
         if not isinstance(v, (int, float)) or v < 0:
             raise ValueError(f"Stat {k} must be a non-negative number")
-    budget = _compute_unit_budget(stats)
+    budget = _budget_from_values(values)
     lo, hi = UNIT_BUDGET_RANGES.get(rarity, (0, 0))
     if not (lo <= budget <= hi):
         raise ValueError(f"Unit budget {budget} outside range [{lo}, {hi}] for {rarity}")
     # TEMPORARY: per-stat cap check disabled; only checks 1-5 enforced
+    return budget
 
 
 def validate_item_payload(rarity: str, slot: str, data: dict) -> None:
@@ -220,13 +287,14 @@ def validate_item_payload(rarity: str, slot: str, data: dict) -> None:
     bonuses = data.get("bonuses") or {}
     if not isinstance(bonuses, dict):
         raise ValueError("Item must have 'bonuses' object")
-    for k in bonuses:
-        if k not in STAT_KEYS:
-            raise ValueError(f"Unknown bonus key: {k}")
+    # One pass: key and value checks plus the budget sum (same weighting as _compute_item_budget)
+    budget = 0.0
     for k, v in bonuses.items():
+        if k not in STAT_KEYS_SET:
+            raise ValueError(f"Unknown bonus key: {k}")
         if not isinstance(v, (int, float)) or v < 0:
             raise ValueError(f"Bonus {k} must be a non-negative number")
-    budget = _compute_item_budget(bonuses)
+        budget += v / 3.0 if k == "hp_max" else v
     lo, hi = ITEM_BUDGET_RANGES.get(rarity, (0, 0))
     if not (lo <= budget <= hi):
         raise ValueError(f"Item budget {budget} outside range [{lo}, {hi}] for {rarity}")
@@ -236,86 +304,104 @@ def validate_item_payload(rarity: str, slot: str, data: dict) -> None:
         has_mod = bool(modifier.get("id"))
     elif modifier:
         has_mod = True
-    if rarity in ("Common", "Uncommon", "Rare", "Epic"):
+    if rarity in NO_MODIFIER_RARITIES:
         if has_mod:
             raise ValueError("Only Legendary and Mythic items may have a modifier")
     else:
         if has_mod and isinstance(modifier, dict):
             mid = modifier.get("id", "")
-            allowed = LEGENDARY_MODIFIERS + MYTHIC_MODIFIERS
-            if mid not in allowed:
+            if mid not in APPROVED_MODIFIERS:
                 raise ValueError(f"Modifier {mid} not in approved pool")
 
 
+# Markdown code fence around the whole response: ```lang\n ... \n```
+_FENCE_RE = re.compile(r"```[^\n]*\n(.*?)\s*```", re.DOTALL)
+
+
 def _parse_json_from_response(text: str) -> dict:
     """Extract a single JSON object from model output (strip markdown if present)."""
     text = text.strip()
     if text.startswith("```"):
-        lines = text.split("\n")
-        if lines[0].startswith("```"):
-            lines = lines[1:]
-        if lines and lines[-1].strip() == "```":
-            lines = lines[:-1]
-        text = "\n".join(lines)
-    return json.loads(text)
+        m = _FENCE_RE.fullmatch(text)
+        # Unterminated fence: drop just the opening line
+        text = m.group(1) if m else text.partition("\n")[2]
+    return orjson.loads(text)
 
 
-def generate_unit(
-    rarity: str,
-    rules_path: str,
-    *,
-    template_id: str | None = None,
-    display_name: str | None = None,
-    archetype: str | None = None,
-    allowed_archetypes: list[str] | None = None,
-    api_key: str | None = None,
-) -> dict:
-    """
-    Generate unit stats. Uses OpenAI when api_key is set, else returns a valid placeholder.
-    Works without templateId (AI invents name). Returns name, rarity, archetype, stats, total_budget, suggestedTemplateId.
-    """
-    if rarity not in RARITIES:
+def _check_unit_args(rarity: str, archetype: str | None, allowed_archetypes: list[str] | None) -> None:
+    if rarity not in RARITIES_SET:
         raise ValueError(f"Invalid rarity: {rarity}")
     if allowed_archetypes and archetype and archetype not in allowed_archetypes:
         raise ValueError(f"archetype {archetype} not in allowed_archetypes")
 
-    if api_key:
-        rules = load_rules(rules_path)
-        user_prompt = build_unit_prompt(
-            rarity,
-            template_id=template_id,
-            display_name=display_name,
-            archetype=archetype,
-            allowed_archetypes=allowed_archetypes,
-        )
-        try:
-            from openai import OpenAI
-            client = OpenAI(api_key=api_key)
-            resp = client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": rules},
-                    {"role": "user", "content": user_prompt},
-                ],
-                temperature=0.4,
-            )
-            text = resp.choices[0].message.content or "{}"
-            _debug_write_ai_response("unit", f"rarity={rarity}", text)
-            data = _parse_json_from_response(text)
-            data.setdefault("rarity", rarity)
-            data.setdefault("stats", {})
-            for key in STAT_KEYS:
-                data["stats"].setdefault(key, 0)
-            data["stats"] = {k: int(data["stats"][k]) for k in STAT_KEYS}
-            validate_unit_payload(rarity, data)
-            data["total_budget"] = round(_compute_unit_budget(data["stats"]), 2)
-            name = (data.get("name") or "").strip() or f"Unit_{rarity}"
-            data["suggestedTemplateId"] = suggest_template_id(name)
-            return data
-        except Exception as e:
-            raise RuntimeError(f"AI unit generation failed: {e}") from e
 
-    # Placeholder: valid unit within rarity budget and stat caps
+def _check_item_args(rarity: str, slot: str) -> None:
+    if rarity not in RARITIES_SET:
+        raise ValueError(f"Invalid rarity: {rarity}")
+    if slot not in SLOTS_SET:
+        raise ValueError(f"Invalid slot: {slot}")
+
+
+# Raised by _unit_from_response / _item_from_response for model output that doesn't parse or validate
+_OUTPUT_ERRORS = (ValueError, TypeError, KeyError, AttributeError)
+
+
+def _ai_failures() -> tuple[type[Exception], ...]:
+    """
+    What an AI stat call can still fail with once the SDK has used up its retries: API errors
+    (APIError covers rate limits, timeouts and connection errors) or bad model output.
+    openai is imported here so the placeholder path never loads it.
+    """
+    from openai import APIError
+
+    return (APIError, *_OUTPUT_ERRORS)
+
+
+def _chat_messages(rules: str, user_prompt: str) -> list[dict]:
+    return [
+        {"role": "system", "content": rules},
+        {"role": "user", "content": user_prompt},
+    ]
+
+
+def _unit_from_response(rarity: str, text: str) -> dict:
+    """Parse, normalize and validate a unit from model output."""
+    data = _parse_json_from_response(text)
+    data.setdefault("rarity", rarity)
+    # Missing stats count as 0, unknown ones are dropped; the normalized stats then only need value/budget checks
+    stats = data.get("stats") or {}
+    values = [int(stats.get(k, 0)) for k in STAT_KEYS]
+    data["stats"] = dict(zip(STAT_KEYS, values))
+    data["total_budget"] = round(_check_unit_values(rarity, values), 2)
+    name = (data.get("name") or "").strip() or f"Unit_{rarity}"
+    data["suggestedTemplateId"] = suggest_template_id(name)
+    return data
+
+
+def _item_from_response(rarity: str, slot: str, text: str) -> dict:
+    """Parse, normalize and validate an item from model output."""
+    data = _parse_json_from_response(text)
+    data.setdefault("rarity", rarity)
+    data.setdefault("slot", slot)
+    # Keep known bonuses as ints and sum the budget in the same pass
+    bonuses = {}
+    budget = 0.0
+    for k, v in (data.get("bonuses") or {}).items():
+        if k in STAT_KEYS_SET:
+            v = bonuses[k] = int(v)
+            budget += v / 3.0 if k == "hp_max" else v
+    data["bonuses"] = bonuses
+    if rarity in NO_MODIFIER_RARITIES:
+        data["modifier"] = None
+    validate_item_payload(rarity, slot, data)
+    data["total_budget_used"] = round(budget, 2)
+    name = (data.get("name") or "").strip() or f"{slot}_{rarity}"
+    data["suggestedTemplateId"] = suggest_template_id(name)
+    return data
+
+
+def _build_unit_placeholder(rarity: str) -> dict:
+    """Placeholder unit fields that depend only on rarity: valid within rarity budget and stat caps."""
     lo, hi = UNIT_BUDGET_RANGES[rarity]
     cap = UNIT_STAT_CAPS[rarity]
     target = (lo + hi) // 2
@@ -337,19 +423,206 @@ def generate_unit(
         placeholder_stats["melee"] = min(cap, placeholder_stats["melee"] + int(lo - budget))
     elif budget > hi:
         placeholder_stats["melee"] = max(0, placeholder_stats["melee"] - int(budget - hi))
+    return {
+        "rarity": rarity,
+        "stats": {k: int(placeholder_stats[k]) for k in STAT_KEYS},
+        "total_budget": round(_compute_unit_budget(placeholder_stats), 2),
+    }
+
+
+def _build_item_placeholder(rarity: str, slot: str) -> dict:
+    """Placeholder item fields that depend only on rarity and slot."""
+    lo, hi = ITEM_BUDGET_RANGES[rarity]
+    if slot == "Weapon":
+        bonuses = {"melee": min(2, hi)}
+    elif slot == "Armor":
+        bonuses = {"hp_max": min(6, hi * 3)}
+    else:
+        bonuses = {"maneuver": min(2, hi)}
+    budget = _compute_item_budget(bonuses)
+    if budget < lo and slot == "Weapon":
+        bonuses["melee"] = min(6, bonuses.get("melee", 0) + 1)
+    return {
+        "rarity": rarity,
+        "slot": slot,
+        "bonuses": {k: int(v) for k, v in bonuses.items()},
+        "modifier": None,
+        "total_budget_used": round(_compute_item_budget(bonuses), 2),
+    }
+
+
+# Placeholders are fixed per rarity (and slot); built once, then copied per request
+_UNIT_PLACEHOLDER: dict[str, dict] = {r: _build_unit_placeholder(r) for r in RARITIES}
+_ITEM_PLACEHOLDER: dict[tuple[str, str], dict] = {(r, s): _build_item_placeholder(r, s) for r in RARITIES for s in SLOTS}
+
+
+def _placeholder_unit(
+    rarity: str,
+    template_id: str | None,
+    display_name: str | None,
+    archetype: str | None,
+    allowed_archetypes: list[str] | None,
+) -> dict:
+    """Placeholder: valid unit within rarity budget and stat caps."""
+    base = _UNIT_PLACEHOLDER[rarity]
     name = display_name or template_id or f"Unit_{rarity}"
     arch = archetype or (allowed_archetypes[0] if allowed_archetypes else "Melee Specialist")
     return {
         "name": name,
         "rarity": rarity,
         "archetype": arch,
-        "stats": {k: int(placeholder_stats[k]) for k in STAT_KEYS},
-        "total_budget": round(_compute_unit_budget(placeholder_stats), 2),
+        "stats": dict(base["stats"]),
+        "total_budget": base["total_budget"],
         "suggestedTemplateId": suggest_template_id(name),
     }
 
 
-def generate_item(
+def _placeholder_item(rarity: str, slot: str, template_id: str | None, display_name: str | None) -> dict:
+    """Placeholder: valid item."""
+    base = _ITEM_PLACEHOLDER[rarity, slot]
+    name = display_name or template_id or f"{slot}_{rarity}"
+    return {
+        "name": name,
+        **base,
+        "bonuses": dict(base["bonuses"]),
+        "suggestedTemplateId": suggest_template_id(name),
+    }
+
+
+# --- Micro-batching: concurrent AI stat requests sharing a key and rules go out as one completion ---
+
+# Collect requests for this long, and merge at most this many into one completion
+STAT_BATCH_WINDOW_SECONDS = 0.025
+STAT_MAX_BATCH = 8
+
+
+async def _complete(api_key: str, rules: str, user_prompt: str) -> str:
+    """One streamed chat completion with the rules as system prompt; returns the raw text."""
+    stream = await get_async_client(api_key).chat.completions.create(
+        model="gpt-4o",
+        messages=_chat_messages(rules, user_prompt),
+        temperature=0.4,
+        stream=True,
+    )
+    parts = [chunk.choices[0].delta.content async for chunk in stream if chunk.choices and chunk.choices[0].delta.content]
+    return "".join(parts) or "{}"
+
+
+def _build_batch_prompt(tasks: list[str]) -> str:
+    """Combine several generation tasks into one prompt that asks for a JSON array in the same order."""
+    k = len(tasks)
+    numbered = "\n\n".join(f"Task {i}: {t}" for i, t in enumerate(tasks, 1))
+    return (
+        f"Complete the following {k} independent generation tasks. Each task's own instructions apply only to that task. "
+        f"Respond with ONLY a JSON array of exactly {k} objects, where element i is the single JSON object for Task i (same order). "
+        f"No markdown code fences, no explanation, no other text.\n\n{numbered}"
+    )
+
+
+async def _complete_one(api_key: str, rules: str, prompt: str, parse) -> tuple[str, dict]:
+    """One standalone completion; returns (raw text, parsed and validated result)."""
+    text = await _complete(api_key, rules, prompt)
+    return text, parse(text)
+
+
+async def _complete_group(api_key: str, rules: str, requests: list[tuple]) -> list[tuple[str, dict] | BaseException]:
+    """
+    Complete requests (prompt, task, parse) that share a key and rules: one call for the group, then a
+    standalone call for each element the combined answer didn't deliver as a valid object. API errors
+    are returned to every caller rather than retried per element (the SDK has already retried).
+    """
+    results: list[tuple[str, dict] | BaseException | None] = [None] * len(requests)
+    if len(requests) > 1:
+        try:
+            text = await _complete(api_key, rules, _build_batch_prompt([task for _, task, _ in requests]))
+        except Exception as e:
+            logger.warning("Batched stat completion for %d requests failed: %s", len(requests), e)
+            return [e] * len(requests)
+        try:
+            items = _parse_json_from_response(text)
+        except ValueError:
+            items = None
+        if isinstance(items, list) and len(items) == len(requests):
+            for i, ((_, _, parse), obj) in enumerate(zip(requests, items)):
+                if not isinstance(obj, dict):
+                    continue
+                obj_text = orjson.dumps(obj).decode()
+                try:
+                    results[i] = (obj_text, parse(obj_text))
+                except _OUTPUT_ERRORS:
+                    continue
+        else:
+            logger.info("Batched stat completion was not a %d-element array; completing individually", len(requests))
+    retry = [i for i, r in enumerate(results) if r is None]
+    if retry:
+        redone = await asyncio.gather(
+            *(_complete_one(api_key, rules, requests[i][0], requests[i][2]) for i in retry), return_exceptions=True
+        )
+        for i, r in zip(retry, redone):
+            results[i] = r
+    return results
+
+
+async def _complete_stat_batch(batch: list[tuple]) -> list[tuple[str, dict] | BaseException]:
+    """
+    MicroBatcher handler: batch items are (api_key, rules, prompt, task, parse), where prompt is the standalone
+    prompt, task its batched form and parse(text) validates one answer. Returns (raw text, result) per item.
+    """
+    groups: dict[tuple[str, str], list[int]] = {}
+    for i, (api_key, rules, *_) in enumerate(batch):
+        groups.setdefault((api_key, rules), []).append(i)
+    results: list[tuple[str, dict] | BaseException] = [None] * len(batch)
+    group_results = await asyncio.gather(
+        *(_complete_group(key, rules, [batch[i][2:] for i in idx]) for (key, rules), idx in groups.items())
+    )
+    for idx, group in zip(groups.values(), group_results):
+        for i, result in zip(idx, group):
+            results[i] = result
+    return results
+
+
+# Shared batcher for AI stat completions
+STAT_BATCHER = MicroBatcher(_complete_stat_batch, window=STAT_BATCH_WINDOW_SECONDS, max_batch=STAT_MAX_BATCH)
+
+
+async def generate_unit_async(
+    rarity: str,
+    rules_path: str,
+    *,
+    template_id: str | None = None,
+    display_name: str | None = None,
+    archetype: str | None = None,
+    allowed_archetypes: list[str] | None = None,
+    api_key: str | None = None,
+) -> dict:
+    """
+    Generate unit stats. Uses OpenAI (via STAT_BATCHER) when api_key is set, else returns a valid placeholder.
+    Works without templateId (AI invents name). Returns name, rarity, archetype, stats, total_budget, suggestedTemplateId.
+    """
+    _check_unit_args(rarity, archetype, allowed_archetypes)
+
+    if api_key:
+        rules = _fresh_rules(rules_path) or await asyncio.to_thread(load_rules, rules_path)
+        prompt_args = dict(
+            template_id=template_id,
+            display_name=display_name,
+            archetype=archetype,
+            allowed_archetypes=allowed_archetypes,
+        )
+        user_prompt = build_unit_prompt(rarity, **prompt_args)
+        task = build_unit_prompt(rarity, **prompt_args, standalone=False)
+        parse = functools.partial(_unit_from_response, rarity)
+        try:
+            text, data = await STAT_BATCHER.submit(api_key, rules, user_prompt, task, parse)
+            await asyncio.to_thread(_debug_write_ai_response, "unit", f"rarity={rarity}", text)
+            return data
+        except _ai_failures() as e:
+            raise RuntimeError(f"AI unit generation failed: {e}") from e
+
+    return _placeholder_unit(rarity, template_id, display_name, archetype, allowed_archetypes)
+
+
+async def generate_item_async(
     rarity: str,
     slot: str,
     rules_path: str,
@@ -359,65 +632,25 @@ def generate_item(
     api_key: str | None = None,
 ) -> dict:
     """
-    Generate item stats and optional modifier. Uses OpenAI when api_key is set, else placeholder.
+    Generate item stats and optional modifier. Uses OpenAI (via STAT_BATCHER) when api_key is set, else placeholder.
     Works without templateId (AI invents name). Returns name, rarity, slot, bonuses, modifier, total_budget_used, suggestedTemplateId.
     """
-    if rarity not in RARITIES:
-        raise ValueError(f"Invalid rarity: {rarity}")
-    if slot not in SLOTS:
-        raise ValueError(f"Invalid slot: {slot}")
+    _check_item_args(rarity, slot)
 
     if api_key:
-        rules = load_rules(rules_path)
+        rules = _fresh_rules(rules_path) or await asyncio.to_thread(load_rules, rules_path)
         user_prompt = build_item_prompt(
             rarity, slot, template_id=template_id, display_name=display_name
         )
+        task = build_item_prompt(
+            rarity, slot, template_id=template_id, display_name=display_name, standalone=False
+        )
+        parse = functools.partial(_item_from_response, rarity, slot)
         try:
-            from openai import OpenAI
-            client = OpenAI(api_key=api_key)
-            resp = client.chat.completions.create(
-                model="gpt-4o",
-                messages=[
-                    {"role": "system", "content": rules},
-                    {"role": "user", "content": user_prompt},
-                ],
-                temperature=0.4,
-            )
-            text = resp.choices[0].message.content or "{}"
-            _debug_write_ai_response("item", f"rarity={rarity} slot={slot}", text)
-            data = _parse_json_from_response(text)
-            data.setdefault("rarity", rarity)
-            data.setdefault("slot", slot)
-            data.setdefault("bonuses", {})
-            data["bonuses"] = {k: int(v) for k, v in (data.get("bonuses") or {}).items() if k in STAT_KEYS}
-            if rarity in ("Common", "Uncommon", "Rare", "Epic"):
-                data["modifier"] = None
-            validate_item_payload(rarity, slot, data)
-            data["total_budget_used"] = round(_compute_item_budget(data["bonuses"]), 2)
-            name = (data.get("name") or "").strip() or f"{slot}_{rarity}"
-            data["suggestedTemplateId"] = suggest_template_id(name)
+            text, data = await STAT_BATCHER.submit(api_key, rules, user_prompt, task, parse)
+            await asyncio.to_thread(_debug_write_ai_response, "item", f"rarity={rarity} slot={slot}", text)
             return data
-        except Exception as e:
+        except _ai_failures() as e:
             raise RuntimeError(f"AI item generation failed: {e}") from e
 
-    # Placeholder: valid item
-    lo, hi = ITEM_BUDGET_RANGES[rarity]
-    if slot == "Weapon":
-        bonuses = {"melee": min(2, hi)}
-    elif slot == "Armor":
-        bonuses = {"hp_max": min(6, hi * 3)}
-    else:
-        bonuses = {"maneuver": min(2, hi)}
-    budget = _compute_item_budget(bonuses)
-    if budget < lo and slot == "Weapon":
-        bonuses["melee"] = min(6, bonuses.get("melee", 0) + 1)
-    name = display_name or template_id or f"{slot}_{rarity}"
-    return {
-        "name": name,
-        "rarity": rarity,
-        "slot": slot,
-        "bonuses": {k: int(v) for k, v in bonuses.items()},
-        "modifier": None,
-        "total_budget_used": round(_compute_item_budget(bonuses), 2),
-        "suggestedTemplateId": suggest_template_id(name),
-    }
+    return _placeholder_item(rarity, slot, template_id, display_name)
@@ -0,0 +1,69 @@
+"""Shared fixtures: fake OpenAI clients so AI code paths run without network access."""
+import base64
+import io
+import types
+
+import pytest
+from PIL import Image
+
+from app import generator, stat_generator
+
+
+class FakeImages:
+    """Stands in for AsyncOpenAI().images: each call returns a distinct solid-color 1024x1024 PNG."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def generate(self, **kwargs):
+        self.calls.append(kwargs)
+        color = (len(self.calls) * 40 % 256, 80, 160, 255)
+        buf = io.BytesIO()
+        Image.new("RGBA", (1024, 1024), color).save(buf, format="PNG")
+        item = types.SimpleNamespace(b64_json=base64.b64encode(buf.getvalue()).decode("ascii"))
+        return types.SimpleNamespace(data=[item])
+
+
+@pytest.fixture(autouse=True)
+def _debug_output(tmp_path, monkeypatch):
+    """Keep the raw AI response debug log out of the working tree."""
+    monkeypatch.setenv("DEBUG_AI_OUTPUT_PATH", str(tmp_path / "ai_response_debug.txt"))
+
+
+@pytest.fixture
+def fake_images(monkeypatch):
+    images = FakeImages()
+    client = types.SimpleNamespace(images=images)
+    monkeypatch.setattr(generator, "get_async_client", lambda api_key: client)
+    generator._AI_MEMORY_CACHE.clear()
+    yield images
+    generator._AI_MEMORY_CACHE.clear()
+
+
+class FakeChatCompletions:
+    """Stands in for AsyncOpenAI().chat.completions with stream=True; respond(user_prompt) returns text or raises."""
+
+    def __init__(self):
+        self.prompts = []
+        self.respond = lambda prompt: "{}"
+
+    async def create(self, **kwargs):
+        assert kwargs.get("stream")
+        prompt = kwargs["messages"][-1]["content"]
+        self.prompts.append(prompt)
+        text = self.respond(prompt)
+
+        async def chunks():
+            for i in range(0, len(text), 16):
+                delta = types.SimpleNamespace(content=text[i:i + 16])
+                yield types.SimpleNamespace(choices=[types.SimpleNamespace(delta=delta)])
+
+        return chunks()
+
+
+@pytest.fixture
+def fake_chat(monkeypatch):
+    completions = FakeChatCompletions()
+    client = types.SimpleNamespace(chat=types.SimpleNamespace(completions=completions))
+    monkeypatch.setattr(stat_generator, "get_async_client", lambda api_key: client)
+    return completions
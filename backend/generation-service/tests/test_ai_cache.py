@@ -0,0 +1,42 @@
+"""AI art cache: identical prompts reuse the image, force=true always asks for a new one."""
+import asyncio
+import os
+
+from app import generator
+
+CATALOG = "/nonexistent/card-templates.json"
+
+
+def _generate(art_dir, template_id, **kwargs):
+    return asyncio.run(
+        generator.generate_and_save(
+            template_id, art_dir, CATALOG, use_ai=True, api_key="test-key", display_name="Same Sword", **kwargs
+        )
+    )
+
+
+def test_identical_prompt_reuses_cached_image(tmp_path, fake_images):
+    a = _generate(tmp_path, "a")
+    generator._AI_MEMORY_CACHE.clear()  # second hit must come from disk
+    b = _generate(tmp_path, "b")
+    assert len(fake_images.calls) == 1
+    assert a.read_bytes() == b.read_bytes()
+
+
+def test_force_skips_cache_and_replaces_entry(tmp_path, fake_images):
+    first = _generate(tmp_path, "a").read_bytes()
+    forced = _generate(tmp_path, "a", force=True).read_bytes()
+    assert len(fake_images.calls) == 2
+    assert forced != first
+    # The forced image is what later identical prompts get
+    assert _generate(tmp_path, "b").read_bytes() == forced
+    assert len(fake_images.calls) == 2
+
+
+def test_prune_keeps_most_recently_used_files(tmp_path):
+    for i in range(5):
+        path = tmp_path / f"{i}.png"
+        path.write_bytes(b"x")
+        os.utime(path, ns=(i * 10**9, i * 10**9))
+    generator._prune_ai_cache(tmp_path, max_files=3)
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["2.png", "3.png", "4.png"]
@@ -0,0 +1,112 @@
+"""Art and border serving: ETag/304, HEAD, cache freshness and the art LRU's byte count."""
+import os
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+
+
+@pytest.fixture
+def assets(tmp_path, monkeypatch):
+    art_dir, borders_dir = tmp_path / "art", tmp_path / "borders"
+    art_dir.mkdir()
+    borders_dir.mkdir()
+    monkeypatch.setattr(main, "ART_DIR", art_dir)
+    monkeypatch.setattr(main, "BORDERS_DIR", borders_dir)
+    monkeypatch.setattr(main, "_art_cache_bytes", 0)
+    main._ART_CACHE.clear()
+    main._BORDER_CACHE.clear()
+    main._KNOWN_ART.clear()
+    yield art_dir, borders_dir
+    main._ART_CACHE.clear()
+    main._BORDER_CACHE.clear()
+
+
+@pytest.fixture
+def client():
+    return TestClient(main.app)  # no lifespan: asset routes don't need the batchers
+
+
+def test_art_etag_and_304(assets, client):
+    art_dir, _ = assets
+    (art_dir / "knight.png").write_bytes(b"png-v1")
+    r = client.get("/assets/art/knight.png")
+    assert r.status_code == 200 and r.content == b"png-v1"
+    assert r.headers["cache-control"] == main.ART_CACHE_CONTROL
+    r = client.get("/assets/art/knight.png", headers={"If-None-Match": r.headers["etag"]})
+    assert r.status_code == 304 and r.content == b""
+
+
+def test_regenerated_art_is_not_served_stale(assets, client):
+    art_dir, _ = assets
+    path = art_dir / "knight.png"
+    path.write_bytes(b"png-v1")
+    first = client.get("/assets/art/knight.png")
+    path.write_bytes(b"png-version-2")
+    os.utime(path, ns=(path.stat().st_mtime_ns + 10**9,) * 2)
+    second = client.get("/assets/art/knight.png")
+    assert second.content == b"png-version-2"
+    assert second.headers["etag"] != first.headers["etag"]
+
+
+def test_head_reports_size_without_reading(assets, client):
+    art_dir, _ = assets
+    (art_dir / "knight.png").write_bytes(b"x" * 1234)
+    r = client.head("/assets/art/knight.png")
+    assert r.status_code == 200
+    assert r.headers["content-length"] == "1234"
+    assert r.content == b""
+    assert "knight" not in main._ART_CACHE
+
+
+def test_missing_art_is_404(assets, client):
+    assert client.get("/assets/art/nobody.png").status_code == 404
+    assert client.head("/assets/art/nobody.png").status_code == 404
+
+
+def test_legacy_long_art_id_is_served(assets, client):
+    art_dir, _ = assets
+    legacy_id = "legacy_" + "x" * 70
+    (art_dir / f"{legacy_id}.png").write_bytes(b"\x89PNG legacy")
+    r = client.get(f"/assets/art/{legacy_id}.png")
+    assert r.status_code == 200
+    assert r.content == b"\x89PNG legacy"
+    assert client.get("/assets/art/a.b.png").status_code == 400
+    assert client.get("/assets/art/foo%0A.png").status_code == 400
+    # New IDs are still length-capped
+    assert client.post(f"/generate/{legacy_id}", json={"displayName": "Old"}).status_code == 400
+
+
+def test_border_added_after_a_miss_is_served(assets, client):
+    _, borders_dir = assets
+    assert client.get("/assets/borders/Rare.png").status_code == 404
+    (borders_dir / "RareBorder.png").write_bytes(b"border")
+    r = client.get("/assets/borders/Rare.png")
+    assert r.status_code == 200 and r.content == b"border"
+    assert r.headers["cache-control"] == main.BORDER_CACHE_CONTROL
+    assert client.get("/assets/borders/Nope.png").json() == {"detail": "Unknown rarity: Nope"}
+
+
+def test_art_cache_byte_count_survives_concurrent_use(assets, monkeypatch):
+    art_dir, _ = assets
+    monkeypatch.setattr(main, "ART_CACHE_MAX_BYTES", 40 * 100)
+    paths = []
+    for i in range(60):
+        path = art_dir / f"a{i}.png"
+        path.write_bytes(bytes([i]) * 100)
+        paths.append((f"a{i}", path, main._etag_for(path.stat())))
+
+    def worker(offset):
+        for n in range(300):
+            template_id, path, etag = paths[(n * 7 + offset) % len(paths)]
+            assert main._art_bytes(template_id, path, etag) == path.read_bytes()
+
+    threads = [threading.Thread(target=worker, args=(k,)) for k in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert main._art_cache_bytes == sum(len(data) for data, _ in main._ART_CACHE.values())
+    assert main._art_cache_bytes <= main.ART_CACHE_MAX_BYTES
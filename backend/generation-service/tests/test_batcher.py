@@ -0,0 +1,60 @@
+"""MicroBatcher / ImageBatcher dispatch behaviour."""
+import asyncio
+import time
+
+from app.batcher import BATCH_WINDOW_SECONDS, ImageBatcher, MicroBatcher
+
+
+def test_requests_within_window_share_a_batch():
+    sizes = []
+
+    async def handle(batch):
+        sizes.append(len(batch))
+        return [args[0] * 2 for args in batch]
+
+    async def main():
+        batcher = MicroBatcher(handle, window=0.05, max_batch=8)
+        results = await asyncio.gather(*(batcher.submit(i) for i in range(5)))
+        await batcher.stop()
+        return results
+
+    assert asyncio.run(main()) == [0, 2, 4, 6, 8]
+    assert sizes == [5]
+
+
+def test_image_batcher_does_not_hold_a_lone_request():
+    async def generate(prompt, api_key):
+        return prompt
+
+    async def main():
+        batcher = ImageBatcher(generate)
+        start = time.perf_counter()
+        result = await batcher.submit("p", "k")
+        elapsed = time.perf_counter() - start
+        await batcher.stop()
+        return result, elapsed
+
+    result, elapsed = asyncio.run(main())
+    assert result == "p"
+    assert elapsed < BATCH_WINDOW_SECONDS
+
+
+def test_image_batcher_batches_requests_queued_together():
+    sizes = []
+
+    class RecordingBatcher(ImageBatcher):
+        async def handle_batch(self, batch):
+            sizes.append(len(batch))
+            return await super().handle_batch(batch)
+
+    async def generate(prompt, api_key):
+        return prompt.upper()
+
+    async def main():
+        batcher = RecordingBatcher(generate, max_batch=4)
+        results = await asyncio.gather(*(batcher.submit(p, "k") for p in "abcdef"))
+        await batcher.stop()
+        return results
+
+    assert asyncio.run(main()) == list("ABCDEF")
+    assert sizes == [4, 2]
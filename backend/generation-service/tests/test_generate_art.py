@@ -0,0 +1,40 @@
+"""POST /generate/{templateId}: existing art is reported as cached unless forced."""
+import pytest
+from fastapi.testclient import TestClient
+
+from app import main
+
+
+@pytest.fixture
+def client(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "ART_DIR", tmp_path)
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    main.get_settings.cache_clear()
+    main._KNOWN_ART.clear()
+    yield TestClient(main.app)
+    main._KNOWN_ART.clear()
+    main.get_settings.cache_clear()
+
+
+def _generate(client, template_id, **params):
+    r = client.post(f"/generate/{template_id}", params=params, json={"displayName": "Test Knight"})
+    assert r.status_code == 200, r.text
+    return r.json()
+
+
+def test_second_request_is_cached(client, tmp_path):
+    assert _generate(client, "knight")["cached"] is False
+    assert _generate(client, "knight")["cached"] is True
+    assert (tmp_path / "knight.png").is_file()
+
+
+def test_force_regenerates(client):
+    _generate(client, "knight")
+    assert _generate(client, "knight", force="true")["cached"] is False
+
+
+def test_deleted_art_is_forgotten_after_a_404(client, tmp_path):
+    _generate(client, "knight")
+    (tmp_path / "knight.png").unlink()
+    assert client.head("/assets/art/knight.png").status_code == 404
+    assert _generate(client, "knight")["cached"] is False
@@ -0,0 +1,73 @@
+"""msgspec-decoded unit/item bodies: routed ahead of /generate/{templateId}; invalid input is a 422 with FastAPI's detail shape."""
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app import main
+from app.main import _ITEM_DECODER, _UNIT_DECODER, _decode_body
+
+
+def _detail(decoder, raw):
+    with pytest.raises(HTTPException) as exc:
+        _decode_body(decoder, raw)
+    assert exc.value.status_code == 422
+    return exc.value.detail
+
+
+def test_valid_body_decodes():
+    body = _decode_body(_ITEM_DECODER, b'{"rarity": "Rare", "allowedSlots": ["Armor"]}')
+    assert (body.rarity, body.slot, body.allowedSlots) == ("Rare", None, ["Armor"])
+
+
+def test_malformed_json():
+    assert _detail(_UNIT_DECODER, b"{")[0]["type"] == "json_invalid"
+
+
+def test_missing_field():
+    assert _detail(_UNIT_DECODER, b"{}") == [{"type": "missing", "loc": ["body", "rarity"], "msg": "Field required"}]
+
+
+def test_wrong_type_reports_location():
+    (error,) = _detail(_UNIT_DECODER, b'{"rarity": "Rare", "allowedArchetypes": ["Mage", 1]}')
+    assert error["loc"] == ["body", "allowedArchetypes", 1]
+    assert error["type"] == "value_error"
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    main.get_settings.cache_clear()
+    yield TestClient(main.app)
+    main.get_settings.cache_clear()
+
+
+def test_unit_endpoint_is_routed_and_decodes(client):
+    r = client.post("/generate/unit", json={"rarity": "Rare", "archetype": "Mage"})
+    assert r.status_code == 200, r.text
+    assert r.json()["rarity"] == "Rare" and r.json()["archetype"] == "Mage"
+
+
+def test_item_endpoint_is_routed_and_decodes(client):
+    r = client.post("/generate/item", json={"rarity": "Epic", "allowedSlots": ["Relic"]})
+    assert r.status_code == 200, r.text
+    assert r.json()["slot"] == "Relic"
+
+
+def test_invalid_bodies_are_422_over_http(client):
+    r = client.post("/generate/unit", json={"rarity": "Rare", "allowedArchetypes": ["Mage", 1]})
+    assert r.status_code == 422
+    assert r.json()["detail"][0]["loc"] == ["body", "allowedArchetypes", 1]
+    r = client.post("/generate/item", json={"slot": "Relic"})
+    assert r.status_code == 422
+    assert r.json()["detail"] == [{"type": "missing", "loc": ["body", "rarity"], "msg": "Field required"}]
+
+
+def test_stat_responses_skip_jsonable_encoder(client, monkeypatch):
+    import fastapi.routing
+
+    calls = []
+    encoder = fastapi.routing.jsonable_encoder
+    monkeypatch.setattr(fastapi.routing, "jsonable_encoder", lambda *a, **k: calls.append(a) or encoder(*a, **k))
+    assert client.post("/generate/unit", json={"rarity": "Rare"}).status_code == 200
+    assert client.post("/generate/item", json={"rarity": "Rare", "slot": "Armor"}).status_code == 200
+    assert calls == []
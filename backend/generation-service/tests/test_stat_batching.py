@@ -0,0 +1,88 @@
+"""Concurrent AI stat requests: one combined completion, per-element fallback, API errors passed through."""
+import asyncio
+import json
+from pathlib import Path
+
+import httpx
+import openai
+import pytest
+
+from app import stat_generator as sg
+
+RULES = str(Path(__file__).resolve().parents[1] / "stat_generation_rules.txt")
+UNIT = {
+    "name": "Grim Ox",
+    "archetype": "Monster Brute",
+    "stats": {"hp_max": 12, "stamina_max": 4, "mana_max": 0, "melee": 8, "ranged": 0, "magic": 2, "maneuver": 3},
+}
+BAD_UNIT = {**UNIT, "stats": {**UNIT["stats"], "melee": 40}}
+
+
+def _burst(n):
+    async def main():
+        try:
+            return await asyncio.gather(
+                *(sg.generate_unit_async("Rare", RULES, api_key="test-key") for _ in range(n)), return_exceptions=True
+            )
+        finally:
+            await sg.STAT_BATCHER.stop()
+
+    return asyncio.run(main())
+
+
+def _is_batch(prompt):
+    return prompt.startswith("Complete the following")
+
+
+def test_concurrent_requests_share_one_completion(fake_chat):
+    fake_chat.respond = lambda p: json.dumps([UNIT] * 3) if _is_batch(p) else json.dumps(UNIT)
+    results = _burst(3)
+    assert [r["stats"] for r in results] == [UNIT["stats"]] * 3
+    assert len(fake_chat.prompts) == 1
+
+
+def test_batched_tasks_do_not_ask_for_a_single_object(fake_chat):
+    fake_chat.respond = lambda p: json.dumps([UNIT] * 2)
+    _burst(2)
+    (prompt,) = fake_chat.prompts
+    assert "JSON array of exactly 2 objects" in prompt
+    assert "Respond with ONLY a single JSON object" not in prompt
+
+
+def test_only_invalid_elements_are_requested_again(fake_chat):
+    fake_chat.respond = lambda p: json.dumps([UNIT, BAD_UNIT, UNIT]) if _is_batch(p) else json.dumps(UNIT)
+    results = _burst(3)
+    assert all(r["stats"] == UNIT["stats"] for r in results)
+    assert len(fake_chat.prompts) == 2
+    assert not _is_batch(fake_chat.prompts[1])
+
+
+def test_malformed_combined_answer_falls_back_per_request(fake_chat):
+    fake_chat.respond = lambda p: "not json" if _is_batch(p) else json.dumps(UNIT)
+    results = _burst(3)
+    assert all(r["stats"] == UNIT["stats"] for r in results)
+    assert len(fake_chat.prompts) == 4
+
+
+def test_api_error_reaches_every_caller_without_fan_out(fake_chat):
+    def respond(prompt):
+        raise openai.APIConnectionError(request=httpx.Request("POST", "https://api.openai.com/v1/chat/completions"))
+
+    fake_chat.respond = respond
+    results = _burst(3)
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert len(fake_chat.prompts) == 1
+
+
+def test_single_request_uses_standalone_prompt(fake_chat):
+    fake_chat.respond = lambda p: json.dumps(UNIT)
+    (result,) = _burst(1)
+    assert result["stats"] == UNIT["stats"]
+    assert fake_chat.prompts[0].endswith("No markdown code fences, no explanation, no other text.")
+
+
+def test_invalid_single_answer_is_a_runtime_error(fake_chat):
+    fake_chat.respond = lambda p: json.dumps(BAD_UNIT)
+    (result,) = _burst(1)
+    with pytest.raises(RuntimeError, match="AI unit generation failed"):
+        raise result
@@ -0,0 +1,38 @@
+"""templateId whitelist: IDs the service suggests always pass it, path tricks never do."""
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+from app import main
+from app.stat_generator import TEMPLATE_ID_MAX_LEN, suggest_template_id
+
+
+@pytest.mark.parametrize(
+    "name",
+    ["Grim Ox", "x" * 200, "The Unbelievably Long-Winded Name Of A Legendary Sword Forged In Dragonfire", "!!!", "", "a" * 57 + " b"],
+)
+def test_suggested_ids_pass_the_whitelist(name):
+    template_id = suggest_template_id(name)
+    assert len(template_id) <= TEMPLATE_ID_MAX_LEN
+    main._check_template_id(template_id)
+
+
+@pytest.mark.parametrize("template_id", ["abc\n", "a.b", "../x", "", "x" * (TEMPLATE_ID_MAX_LEN + 1), "a b"])
+def test_whitelist_rejects(template_id):
+    with pytest.raises(HTTPException) as exc:
+        main._check_template_id(template_id)
+    assert exc.value.status_code == 400
+
+
+def test_generate_accepts_long_suggested_id(tmp_path, monkeypatch):
+    monkeypatch.setattr(main, "ART_DIR", tmp_path)
+    monkeypatch.delenv("OPENAI_API_KEY", raising=False)
+    main.get_settings.cache_clear()
+    template_id = suggest_template_id("The Unbelievably Long-Winded Name Of A Legendary Sword Forged In Dragonfire")
+    client = TestClient(main.app)
+    r = client.post(f"/generate/{template_id}", json={"displayName": "Long Sword"})
+    assert r.status_code == 200, r.text
+    assert (tmp_path / f"{template_id}.png").is_file()
+    assert client.get("/assets/art/foo%0A.png").status_code == 400
+    main._KNOWN_ART.discard(template_id)
+    main.get_settings.cache_clear()